@@ -7,7 +7,7 @@ from sqlalchemy import pool
 from alembic import context
 from app.config import settings
 from app.database import Base
-from app.models import User, Contract, ContractAttachment, ContractOperationLog
+from app.models import User, Contract, ContractAttachment, AttachmentBlob, ContractOperationLog, ExportJob
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
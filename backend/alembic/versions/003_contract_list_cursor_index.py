@@ -0,0 +1,36 @@
+"""composite index for contract list cursor pagination
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 大表上在线建索引，避免长时间锁表；CONCURRENTLY 不能在事务内执行
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_contracts_updated_at_id",
+            "contracts",
+            ["updated_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_contracts_updated_at_id",
+            table_name="contracts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
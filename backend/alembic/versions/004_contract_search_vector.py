@@ -0,0 +1,65 @@
+"""contract keyword search: bigram tsvector column and GIN index
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 与 app.models.contract.SEARCH_VECTOR_SQL 一致
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, contract_search_bigrams(title)), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, contract_search_bigrams(contract_no)), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, contract_search_bigrams(party_a)), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, contract_search_bigrams(party_b)), 'B')"
+)
+
+
+def upgrade() -> None:
+    # 中文无空格分词，统一切成相邻二元组：'采购合同' -> '采购 购合 合同'。
+    # 查询端用 phraseto_tsquery 对关键词做同样切分，相邻位置匹配即子串匹配。
+    op.execute(
+        r"""
+        CREATE OR REPLACE FUNCTION contract_search_bigrams(doc text) RETURNS text
+        LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+            SELECT coalesce(
+                (SELECT string_agg(substr(t, i, 2), ' ' ORDER BY i) FROM generate_series(1, length(t) - 1) AS i),
+                t
+            )
+            FROM (SELECT lower(regexp_replace(doc, '\s+', '', 'g')) AS t) s
+        $$
+        """
+    )
+    op.add_column(
+        "contracts",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_contracts_search_vector",
+            "contracts",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contracts_search_vector", table_name="contracts", if_exists=True)
+    op.drop_column("contracts", "search_vector")
+    op.execute("DROP FUNCTION IF EXISTS contract_search_bigrams(text)")
@@ -0,0 +1,53 @@
+"""content-addressed attachment blobs
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "attachment_blobs",
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("file_path", sa.String(512), nullable=False),
+        sa.Column("file_size", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+    # GC 只扫描无引用的内容块
+    op.create_index(
+        "ix_attachment_blobs_unreferenced",
+        "attachment_blobs",
+        ["updated_at"],
+        postgresql_where=sa.text("ref_count <= 0"),
+    )
+    op.add_column("contract_attachments", sa.Column("blob_sha256", sa.String(64), nullable=True))
+    op.create_foreign_key(
+        "fk_contract_attachments_blob_sha256",
+        "contract_attachments",
+        "attachment_blobs",
+        ["blob_sha256"],
+        ["sha256"],
+    )
+    op.create_index("ix_contract_attachments_blob_sha256", "contract_attachments", ["blob_sha256"])
+    # 已有文件迁入内容寻址存储需访问上传目录，见 scripts/migrate_attachment_blobs.py
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contract_attachments_blob_sha256", table_name="contract_attachments")
+    op.drop_constraint("fk_contract_attachments_blob_sha256", "contract_attachments", type_="foreignkey")
+    op.drop_column("contract_attachments", "blob_sha256")
+    op.drop_index("ix_attachment_blobs_unreferenced", table_name="attachment_blobs")
+    op.drop_table("attachment_blobs")
@@ -0,0 +1,55 @@
+"""background export jobs
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE TYPE exportjobkind AS ENUM ('contracts_pdf_zip', 'contracts_csv', 'operation_logs_csv')")
+    op.execute("CREATE TYPE exportjobstatus AS ENUM ('queued', 'running', 'succeeded', 'failed')")
+    op.create_table(
+        "export_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("kind", postgresql.ENUM("contracts_pdf_zip", "contracts_csv", "operation_logs_csv", name="exportjobkind", create_type=False), nullable=False),
+        sa.Column("status", postgresql.ENUM("queued", "running", "succeeded", "failed", name="exportjobstatus", create_type=False), nullable=False),
+        sa.Column("params", postgresql.JSONB(), nullable=False),
+        sa.Column("progress", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total", sa.Integer(), nullable=True),
+        sa.Column("artifact_path", sa.String(512), nullable=True),
+        sa.Column("artifact_name", sa.String(256), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_by", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_export_jobs_created_by", "export_jobs", ["created_by"])
+    op.create_index(
+        "ix_export_jobs_unfinished",
+        "export_jobs",
+        ["status", "created_at"],
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_export_jobs_unfinished", table_name="export_jobs")
+    op.drop_index("ix_export_jobs_created_by", table_name="export_jobs")
+    op.drop_table("export_jobs")
+    op.execute("DROP TYPE exportjobstatus")
+    op.execute("DROP TYPE exportjobkind")
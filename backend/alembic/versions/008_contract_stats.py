@@ -0,0 +1,45 @@
+"""contract statistics materialized view
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 各维度一行一个分组：status / month（签订月份，未填为空串）/ creator（用户 id）/ party_a / party_b
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW contract_stats AS
+        SELECT 'status'::text AS dimension, status::text AS bucket,
+               count(*) AS contract_count, coalesce(sum(amount), 0) AS total_amount
+          FROM contracts GROUP BY status
+        UNION ALL
+        SELECT 'month', coalesce(to_char(sign_date, 'YYYY-MM'), ''), count(*), coalesce(sum(amount), 0)
+          FROM contracts GROUP BY 2
+        UNION ALL
+        SELECT 'creator', created_by::text, count(*), coalesce(sum(amount), 0)
+          FROM contracts GROUP BY created_by
+        UNION ALL
+        SELECT 'party_a', party_a, count(*), coalesce(sum(amount), 0)
+          FROM contracts GROUP BY party_a
+        UNION ALL
+        SELECT 'party_b', party_b, count(*), coalesce(sum(amount), 0)
+          FROM contracts GROUP BY party_b
+        """
+    )
+    # REFRESH ... CONCURRENTLY 需要唯一索引
+    op.execute("CREATE UNIQUE INDEX ux_contract_stats_dimension_bucket ON contract_stats (dimension, bucket)")
+    op.execute("CREATE INDEX ix_contract_stats_dimension_amount ON contract_stats (dimension, total_amount DESC)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS contract_stats")
@@ -0,0 +1,102 @@
+"""partition contract_operation_logs by month
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18
+
+"""
+from datetime import date, datetime
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 迁移时预建的未来月份数；之后由 scripts/maintain_operation_logs.py 与应用启动时补建
+PARTITIONS_AHEAD = 3
+
+_COLUMNS = "id, contract_id, user_id, action, from_status, to_status, remark, created_at"
+
+
+def _add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE contract_operation_logs RENAME TO contract_operation_logs_legacy")
+    op.execute("ALTER INDEX contract_operation_logs_pkey RENAME TO contract_operation_logs_legacy_pkey")
+    op.execute("ALTER INDEX ix_contract_operation_logs_contract_id RENAME TO ix_contract_operation_logs_legacy_contract_id")
+    op.execute("ALTER INDEX ix_contract_operation_logs_user_id RENAME TO ix_contract_operation_logs_legacy_user_id")
+
+    # 分区键须包含在主键中
+    op.execute(
+        """
+        CREATE TABLE contract_operation_logs (
+            id uuid NOT NULL,
+            contract_id uuid NOT NULL REFERENCES contracts (id) ON DELETE CASCADE,
+            user_id uuid NOT NULL REFERENCES users (id),
+            action varchar(32) NOT NULL,
+            from_status varchar(32),
+            to_status varchar(32),
+            remark text,
+            created_at timestamp without time zone NOT NULL,
+            CONSTRAINT contract_operation_logs_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    # 兜底分区：未及时建出的月份先落在这里，补建分区时迁出
+    op.execute("CREATE TABLE contract_operation_logs_default PARTITION OF contract_operation_logs DEFAULT")
+
+    oldest = op.get_bind().execute(sa.text("SELECT min(created_at) FROM contract_operation_logs_legacy")).scalar()
+    this_month = datetime.utcnow().date().replace(day=1)
+    month = (oldest.date() if oldest else this_month).replace(day=1)
+    end = _add_months(this_month, PARTITIONS_AHEAD + 1)
+    while month < end:
+        nxt = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE contract_operation_logs_p{month:%Y%m} PARTITION OF contract_operation_logs "
+            f"FOR VALUES FROM ('{month}') TO ('{nxt}')"
+        )
+        month = nxt
+
+    op.execute(f"INSERT INTO contract_operation_logs ({_COLUMNS}) SELECT {_COLUMNS} FROM contract_operation_logs_legacy")
+    op.execute("DROP TABLE contract_operation_logs_legacy")
+
+    # 建在父表上的索引会在每个分区（含之后新建的分区）上自动创建
+    op.create_index("ix_contract_operation_logs_contract_id", "contract_operation_logs", ["contract_id"])
+    op.create_index("ix_contract_operation_logs_user_id", "contract_operation_logs", ["user_id"])
+    op.create_index("ix_contract_operation_logs_created_at", "contract_operation_logs", ["created_at"])
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE contract_operation_logs RENAME TO contract_operation_logs_partitioned")
+    op.execute("ALTER INDEX contract_operation_logs_pkey RENAME TO contract_operation_logs_partitioned_pkey")
+    op.execute("ALTER INDEX ix_contract_operation_logs_contract_id RENAME TO ix_contract_operation_logs_partitioned_contract_id")
+    op.execute("ALTER INDEX ix_contract_operation_logs_user_id RENAME TO ix_contract_operation_logs_partitioned_user_id")
+    op.execute("DROP INDEX ix_contract_operation_logs_created_at")
+    op.execute(
+        """
+        CREATE TABLE contract_operation_logs (
+            id uuid NOT NULL,
+            contract_id uuid NOT NULL REFERENCES contracts (id) ON DELETE CASCADE,
+            user_id uuid NOT NULL REFERENCES users (id),
+            action varchar(32) NOT NULL,
+            from_status varchar(32),
+            to_status varchar(32),
+            remark text,
+            created_at timestamp without time zone NOT NULL,
+            CONSTRAINT contract_operation_logs_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    # 已归档（分离并删除）的分区不会恢复
+    op.execute(
+        f"INSERT INTO contract_operation_logs ({_COLUMNS}) SELECT {_COLUMNS} FROM contract_operation_logs_partitioned"
+    )
+    op.execute("DROP TABLE contract_operation_logs_partitioned")
+    op.create_index("ix_contract_operation_logs_contract_id", "contract_operation_logs", ["contract_id"])
+    op.create_index("ix_contract_operation_logs_user_id", "contract_operation_logs", ["user_id"])
@@ -0,0 +1,38 @@
+"""composite (…, created_at, id) indexes for operation log keyset pagination
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 与游标排序 (created_at, id) 一致，按合同 / 用户过滤时也能直接按索引顺序取一页；
+    # 以 contract_id 开头的索引同时服务外键级联删除，替代原单列索引
+    op.create_index(
+        "ix_contract_operation_logs_contract_created_id", "contract_operation_logs", ["contract_id", "created_at", "id"]
+    )
+    op.create_index(
+        "ix_contract_operation_logs_user_created_id", "contract_operation_logs", ["user_id", "created_at", "id"]
+    )
+    op.create_index("ix_contract_operation_logs_created_id", "contract_operation_logs", ["created_at", "id"])
+    op.drop_index("ix_contract_operation_logs_contract_id", table_name="contract_operation_logs")
+    op.drop_index("ix_contract_operation_logs_user_id", table_name="contract_operation_logs")
+    op.drop_index("ix_contract_operation_logs_created_at", table_name="contract_operation_logs")
+
+
+def downgrade() -> None:
+    op.create_index("ix_contract_operation_logs_created_at", "contract_operation_logs", ["created_at"])
+    op.create_index("ix_contract_operation_logs_user_id", "contract_operation_logs", ["user_id"])
+    op.create_index("ix_contract_operation_logs_contract_id", "contract_operation_logs", ["contract_id"])
+    op.drop_index("ix_contract_operation_logs_created_id", table_name="contract_operation_logs")
+    op.drop_index("ix_contract_operation_logs_user_created_id", table_name="contract_operation_logs")
+    op.drop_index("ix_contract_operation_logs_contract_created_id", table_name="contract_operation_logs")
@@ -0,0 +1,55 @@
+"""composite and partial indexes for contract list filters
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 列表统一按 (updated_at, id) 倒序，各索引以过滤列开头、排序列结尾，取一页无需排序；
+    # sign_date 范围作为索引扫描上的过滤条件（scripts/check_query_plans.py 校验执行计划）
+    with op.get_context().autocommit_block():
+        # 普通用户只看自己创建的合同
+        op.create_index(
+            "ix_contracts_created_by_updated_at_id",
+            "contracts",
+            ["created_by", "updated_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # 按状态筛选：已生效合同占多数，直接扫 ix_contracts_updated_at_id 过滤即可；
+        # 其余状态（审批队列、草稿、驳回、到期、终止）行数少，用部分索引
+        op.create_index(
+            "ix_contracts_status_updated_at_id",
+            "contracts",
+            ["status", "updated_at", "id"],
+            postgresql_where=sa.text("status <> 'active'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_contracts_status_updated_at_id",
+            table_name="contracts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_contracts_created_by_updated_at_id",
+            table_name="contracts",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,43 @@
+"""make the contract status list index non-partial
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_INDEX = "ix_contracts_status_updated_at_id"
+_TMP = _INDEX + "_tmp"
+
+
+def _swap(where) -> None:
+    # 先并发建好新索引再删旧索引、改名，替换期间按状态筛选一直有索引可用
+    with op.get_context().autocommit_block():
+        op.create_index(
+            _TMP,
+            "contracts",
+            ["status", "updated_at", "id"],
+            postgresql_where=where,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(_INDEX, table_name="contracts", postgresql_concurrently=True, if_exists=True)
+        op.execute(f"ALTER INDEX {_TMP} RENAME TO {_INDEX}")
+
+
+def upgrade() -> None:
+    # 部分索引（status <> 'active'）对 asyncpg 预备语句无效：通用计划中的 status = $1 无法证明满足谓词，
+    # 规划器不会选用它。改为完整索引，任意状态筛选都能直接按序取页
+    _swap(None)
+
+
+def downgrade() -> None:
+    _swap(sa.text("status <> 'active'"))
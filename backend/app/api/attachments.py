@@ -1,21 +1,31 @@
 """合同附件上传与下载。"""
 import uuid
 from urllib.parse import quote
-from fastapi import APIRouter, Depends, UploadFile, File, status
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, UploadFile, File, Request, status
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
 from app.models.contract import Contract
 from app.models.attachment import ContractAttachment
 from app.services.auth import get_current_user
+from app.services.blob import acquire_blob, promote_after_commit
 from app.services.contract import ContractService
-from app.storage import LocalStorage
+from app.services.streaming import file_response
+from app.storage import LocalStorage, FileTooLarge
 
 router = APIRouter(tags=["attachments"])
 storage = LocalStorage()
 
 
+def _too_large(max_size: int):
+    from fastapi import HTTPException
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"附件不能超过 {max_size // (1024 * 1024)} MB",
+    )
+
+
 @router.post("/contracts/{contract_id}/attachments", status_code=status.HTTP_201_CREATED)
 def upload_attachment(
     contract_id: uuid.UUID,
@@ -30,16 +40,33 @@ def upload_attachment(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="无权限上传附件",
         )
-    content = file.file.read()
-    size = len(content)
-    key = f"contracts/{contract_id}/{uuid.uuid4()}_{file.filename or 'file'}"
-    from io import BytesIO
-    storage.save(key, BytesIO(content), size)
+    max_size = settings.upload_max_bytes
+    if file.size is not None and file.size > max_size:
+        raise _too_large(max_size)
+    # 分块写入临时文件，边写边计算大小与 SHA-256，不在内存中整体缓存
+    try:
+        staged = storage.stage(file.file, max_size)
+    except FileTooLarge:
+        raise _too_large(max_size)
+    blob_sha256 = None
+    try:
+        if settings.attachment_dedup:
+            # 内容寻址：相同内容只存一份，重复上传仅增加引用数
+            key = acquire_blob(db, storage, staged)
+            blob_sha256 = staged.sha256
+        else:
+            key = f"contracts/{contract_id}/{uuid.uuid4()}_{file.filename or 'file'}"
+            promote_after_commit(db, storage, staged, key)
+    except Exception:
+        storage.discard(staged)
+        raise
     att = ContractAttachment(
         contract_id=contract_id,
         file_name=file.filename or "file",
         file_path=key,
-        file_size=size,
+        file_size=staged.size,
+        sha256=staged.sha256,
+        blob_sha256=blob_sha256,
     )
     db.add(att)
     db.commit()
@@ -48,6 +75,7 @@ def upload_attachment(
         "id": str(att.id),
         "file_name": att.file_name,
         "file_size": att.file_size,
+        "sha256": att.sha256,
     }
 
 
@@ -55,6 +83,7 @@ def upload_attachment(
 def download_attachment(
     contract_id: uuid.UUID,
     attachment_id: uuid.UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -70,7 +99,7 @@ def download_attachment(
             detail="附件不存在",
         )
     try:
-        data = storage.read(att.file_path)
+        size = storage.size(att.file_path)
     except FileNotFoundError:
         from fastapi import HTTPException
         raise HTTPException(
@@ -83,8 +112,11 @@ def download_attachment(
         ascii_fallback = att.file_name
     encoded_name = quote(att.file_name, safe="")
     disposition = f"attachment; filename=\"{ascii_fallback}\"; filename*=UTF-8''{encoded_name}"
-    return Response(
-        content=data,
-        media_type="application/octet-stream",
+    # 附件内容写入后不再变化：优先用内容哈希作强 ETag，历史数据用附件 id
+    return file_response(
+        request,
+        lambda: storage.open(att.file_path),
+        size,
+        etag=f'"{att.sha256 or att.id.hex}"',
         headers={"Content-Disposition": disposition},
     )
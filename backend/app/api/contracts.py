@@ -1,10 +1,12 @@
 from urllib.parse import quote
 from uuid import UUID
-from datetime import date
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import Response
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile, status
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.config import settings
+from app.database import get_async_db, get_db
 from app.models.user import User
 from app.models.contract import ContractStatus
 from app.schemas.contract import (
@@ -12,12 +14,22 @@ from app.schemas.contract import (
     ContractUpdate,
     ContractResponse,
     ContractListResponse,
+    ContractBulkExportRequest,
+    ContractBulkActionRequest,
+    ContractBulkActionItem,
+    ContractBulkActionResponse,
+    ContractImportResponse,
 )
 from app.schemas.attachment import AttachmentResponse
 from app.schemas.operation_log import ApproveRejectRequest, OperationLogResponse
 from app.services.auth import get_current_user
+from app.services.bulk_export import build_pdf_jobs, iter_pdf_zip
 from app.services.contract import ContractService
-from app.services.pdf import build_contract_pdf
+from app.services.export import iter_contract_export
+from app.services.importer import import_contracts
+from app.services.pdf_engine import pdf_engine
+from app.services.pdf_cache import pdf_cache, pdf_etag
+from app.services.streaming import etag_matches
 
 router = APIRouter(prefix="/contracts", tags=["contracts"])
 
@@ -44,6 +56,7 @@ def _contract_to_response(c) -> ContractResponse:
                 contract_id=str(a.contract_id),
                 file_name=a.file_name,
                 file_size=a.file_size,
+                sha256=a.sha256,
                 created_at=a.created_at,
             )
             for a in c.attachments
@@ -52,21 +65,28 @@ def _contract_to_response(c) -> ContractResponse:
 
 
 @router.get("", response_model=dict)
-def list_contracts(
+async def list_contracts(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
     keyword: str | None = None,
     status_filter: ContractStatus | None = None,
     sign_date_from: date | None = None,
     sign_date_to: date | None = None,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    order: str | None = Query(None, pattern="^(updated|relevance)$"),
+    include_total: bool = True,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    total, items = ContractService.list_contracts(
-        db, current_user, skip, limit, keyword, status_filter, sign_date_from, sign_date_to
+    total, total_exact, items = await ContractService.list_contracts_async(
+        db, current_user, skip, limit, keyword, status_filter, sign_date_from, sign_date_to, cursor, order,
+        include_total,
     )
+    order = "updated" if cursor else ContractService.resolve_order(keyword, order)
     return {
         "total": total,
+        "total_exact": total_exact,
+        "next_cursor": ContractService.next_cursor(items, limit, order),
         "items": [
             ContractListResponse(
                 id=str(c.id),
@@ -84,15 +104,120 @@ def list_contracts(
     }
 
 
+_EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+@router.get("/export")
+def export_contracts(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|xlsx)$"),
+    keyword: str | None = None,
+    status_filter: ContractStatus | None = None,
+    sign_date_from: date | None = None,
+    sign_date_to: date | None = None,
+    current_user: User = Depends(get_current_user),
+):
+    """按列表筛选条件导出全部合同，服务端游标逐批读取、流式输出。"""
+    filters = {
+        "keyword": keyword,
+        "status_filter": status_filter,
+        "sign_date_from": sign_date_from,
+        "sign_date_to": sign_date_to,
+    }
+    filename = quote(f"合同列表_{datetime.now():%Y%m%d%H%M%S}.{fmt}")
+    return StreamingResponse(
+        iter_contract_export(current_user, filters, fmt),
+        media_type=_EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"},
+    )
+
+
+@router.post("/bulk", response_model=ContractBulkActionResponse)
+def bulk_action(
+    body: ContractBulkActionRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """批量审批、驳回、撤回或删除；单个合同失败不影响其他合同，结果逐个返回。"""
+    results = ContractService.bulk_action(db, body.ids, current_user, body.action, body.remark)
+    succeeded = sum(1 for r in results if r["success"])
+    return ContractBulkActionResponse(
+        action=body.action,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=[ContractBulkActionItem(**{**r, "id": str(r["id"])}) for r in results],
+    )
+
+
+@router.post("/import", response_model=ContractImportResponse)
+def import_contracts_file(
+    file: UploadFile = File(...),
+    skip_invalid: bool = False,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """从 CSV / XLSX 批量导入合同。默认有任一行校验失败则不导入，返回逐行错误。"""
+    if file.size is not None and file.size > settings.upload_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"文件不能超过 {settings.upload_max_bytes // (1024 * 1024)} MB",
+        )
+    result = import_contracts(
+        db, file.file, file.filename or "", current_user, skip_invalid=skip_invalid, dry_run=dry_run
+    )
+    return ContractImportResponse(
+        total=result.total,
+        imported=result.imported,
+        failed=result.failed,
+        committed=result.committed,
+        errors=result.errors,
+    )
+
+
+@router.post("/export/pdf")
+def export_contracts_pdf_zip(
+    body: ContractBulkExportRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """批量导出合同 PDF 为 ZIP，边渲染边输出。"""
+    contracts = ContractService.list_for_export(
+        db,
+        current_user,
+        ids=body.ids,
+        keyword=body.keyword,
+        status_filter=body.status_filter,
+        sign_date_from=body.sign_date_from,
+        sign_date_to=body.sign_date_to,
+        max_rows=settings.bulk_export_max_contracts,
+    )
+    jobs = build_pdf_jobs(contracts)
+    filename = quote(f"合同导出_{datetime.now():%Y%m%d%H%M%S}.zip")
+    return StreamingResponse(
+        iter_pdf_zip(jobs),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"},
+    )
+
+
 @router.get("/{contract_id}/pdf")
 def export_contract_pdf(
     contract_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """导出合同为 PDF。"""
+    """导出合同为 PDF。合同未变更时直接返回缓存；浏览器带 If-None-Match 重新验证时返回 304。"""
     contract = ContractService.get_contract(db, contract_id, current_user)
-    pdf_bytes = build_contract_pdf(contract)
+    etag = pdf_etag(contract)
+    # 强制浏览器每次重新验证，避免合同变更后仍使用旧文件
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers)
+    pdf_bytes = pdf_cache.get_or_render(contract, pdf_engine.render)
     filename = f"合同_{contract.contract_no}.pdf"
     encoded_filename = quote(filename)
     return Response(
@@ -100,17 +225,18 @@ def export_contract_pdf(
         media_type="application/pdf",
         headers={
             "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
+            **cache_headers,
         },
     )
 
 
 @router.get("/{contract_id}", response_model=ContractResponse)
-def get_contract(
+async def get_contract(
     contract_id: UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    contract = ContractService.get_contract(db, contract_id, current_user)
+    contract = await ContractService.get_contract_async(db, contract_id, current_user)
     return _contract_to_response(contract)
 
 
@@ -223,12 +349,21 @@ def admin_reject(
 
 
 @router.get("/{contract_id}/operations", response_model=list[OperationLogResponse])
-def list_contract_operations(
+async def list_contract_operations(
     contract_id: UUID,
-    db: Session = Depends(get_db),
+    response: Response,
+    cursor: str | None = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    limit: int | None = Query(None, ge=1, le=500, description="每页条数，不传返回全部"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
-    contract, logs = ContractService.list_operation_logs_for_contract(db, contract_id, current_user)
+    contract, logs = await ContractService.list_operation_logs_for_contract_async(
+        db, contract_id, current_user, cursor=cursor, limit=limit
+    )
+    # 响应体保持列表格式，下一页游标放在响应头中
+    next_cursor = ContractService.next_log_cursor(logs, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     contract_no = contract.contract_no if contract else ""
     return [
         OperationLogResponse(
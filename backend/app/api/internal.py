@@ -0,0 +1,56 @@
+"""内部运维接口（仅超级管理员）：连接池、请求指标等运行状态。"""
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.config import settings
+from app.database import async_engine, engine
+from app.metrics import registry
+from app.models.user import User, UserRole
+from app.pool import pool_status
+from app.services.auth import get_current_user, require_super_admin, security
+from app.services.password import password_hasher
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/pool")
+async def get_pool_status(current_user: User = Depends(require_super_admin)):
+    """同步/异步引擎连接池的占用与累计等待；与 Postgres max_connections 对照调整池大小。"""
+    return {
+        "pgbouncer": settings.db_pgbouncer,
+        "sync": pool_status(engine),
+        "async": pool_status(async_engine.sync_engine),
+    }
+
+
+async def _metrics_access(credentials: HTTPAuthorizationCredentials | None = Depends(security)) -> None:
+    """配置了 metrics_token 时接受该令牌（供 Prometheus 抓取），否则需超级管理员登录。"""
+    if settings.metrics_token and credentials and hmac.compare_digest(
+        credentials.credentials.encode(), settings.metrics_token.encode()
+    ):
+        return
+    user = await get_current_user(credentials)
+    if user.role != UserRole.super_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅超级管理员可操作")
+
+
+def _numeric_gauges(prefix: str, values: dict, **labels) -> dict[str, list[tuple[dict, float]]]:
+    return {
+        f"{prefix}_{k}": [(labels, v)]
+        for k, v in values.items()
+        if isinstance(v, (int, float)) and not isinstance(v, bool)
+    }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(_: None = Depends(_metrics_access)):
+    """Prometheus 文本格式：按路由模板的请求数、延迟、响应大小与数据库往返，以及连接池、bcrypt 线程池状态。"""
+    gauges: dict[str, list[tuple[dict, float]]] = {}
+    for name, eng in (("sync", engine), ("async", async_engine.sync_engine)):
+        for metric, samples in _numeric_gauges("db_pool", pool_status(eng), engine=name).items():
+            gauges.setdefault(metric, []).extend(samples)
+    gauges.update(_numeric_gauges("password_hasher", password_hasher.stats()))
+    return PlainTextResponse(registry.render(gauges), media_type="text/plain; version=0.0.4")
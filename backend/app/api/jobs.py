@@ -0,0 +1,63 @@
+"""后台导出任务：提交、查询进度、下载结果。"""
+from urllib.parse import quote
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.user import User
+from app.schemas.export_job import ExportJobCreate, ExportJobResponse
+from app.services.auth import get_current_user
+from app.services.jobs import JobService, MEDIA_TYPES
+from app.services.streaming import file_response
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.post("", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def submit_job(
+    data: ExportJobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return JobService.submit(db, current_user, data)
+
+
+@router.get("", response_model=list[ExportJobResponse])
+def list_jobs(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return JobService.list_jobs(db, current_user)
+
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+def get_job(
+    job_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return JobService.get_job(db, job_id, current_user)
+
+
+@router.get("/{job_id}/download")
+def download_job_artifact(
+    job_id: UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = JobService.get_job(db, job_id, current_user)
+    path = JobService.artifact_path(job)
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="导出文件不存在")
+    filename = quote(job.artifact_name or path.name)
+    return file_response(
+        request,
+        lambda: open(path, "rb"),
+        size,
+        etag=f'"{job.id.hex}"',
+        media_type=MEDIA_TYPES[job.kind],
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"},
+    )
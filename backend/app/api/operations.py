@@ -1,8 +1,9 @@
 """全局操作日志（仅超级管理员）。"""
+from datetime import datetime
 from uuid import UUID
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
 from app.models.user import User
 from app.schemas.operation_log import OperationLogResponse
 from app.services.auth import get_current_user, require_super_admin
@@ -12,19 +13,27 @@ router = APIRouter(prefix="/operations", tags=["operations"])
 
 
 @router.get("", response_model=dict)
-def list_operations_global(
+async def list_operations_global(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=200),
     contract_id: UUID | None = None,
     user_id: UUID | None = None,
-    db: Session = Depends(get_db),
+    created_from: datetime | None = Query(None, description="起始时间（含）"),
+    created_to: datetime | None = Query(None, description="截止时间（不含）"),
+    include_total: bool = True,
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor，传入时忽略 skip"),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_super_admin),
 ):
-    total, items = ContractService.list_operation_logs_global(
-        db, current_user, contract_id=contract_id, user_id=user_id, skip=skip, limit=limit
+    total, total_exact, items = await ContractService.list_operation_logs_global_async(
+        db, current_user, contract_id=contract_id, user_id=user_id, skip=skip, limit=limit,
+        include_total=include_total, created_from=created_from, created_to=created_to,
+        cursor=cursor,
     )
     return {
         "total": total,
+        "total_exact": total_exact,
+        "next_cursor": ContractService.next_log_cursor([log for log, _ in items], limit),
         "items": [
             {
                 "id": str(log.id),
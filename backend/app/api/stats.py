@@ -0,0 +1,21 @@
+"""合同统计（财务与超级管理员）。"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.models.user import User
+from app.schemas.stats import StatsBucket
+from app.services.auth import get_current_user
+from app.services.stats import DIMENSIONS, StatsService
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("/contracts", response_model=list[StatsBucket])
+async def contract_stats(
+    dimension: str = Query("status", pattern=f"^({'|'.join(DIMENSIONS)})$"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    """按状态、签订月份、创建人、甲方或乙方汇总合同数与金额；状态与月份返回全部分组，其余按金额取前 limit 个。"""
+    return await StatsService.contract_stats(db, current_user, dimension, limit)
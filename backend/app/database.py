@@ -1,17 +1,51 @@
 """数据库连接与会话。"""
+from uuid import uuid4
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.config import settings
+from app.pool import PoolStats, engine_pool_options
+
+sync_pool_stats = PoolStats("sync")
+async_pool_stats = PoolStats("async")
 
 engine = create_engine(
     settings.database_url,
-    pool_pre_ping=True,
+    **engine_pool_options(settings, sync_pool_stats),
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def _async_url(url: str):
+    """同一数据库的 asyncpg 连接串。"""
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+def _async_connect_args() -> dict:
+    if not settings.db_pgbouncer:
+        return {}
+    # PgBouncer 的 transaction 模式下服务端预编译语句不能跨事务复用：关闭缓存，并为每条语句生成唯一名称
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+    }
+
+
+# 异步引擎：async def 路由使用，等待数据库期间不占用线程
+async_engine = create_async_engine(
+    _async_url(settings.database_url),
+    connect_args=_async_connect_args(),
+    **engine_pool_options(settings, async_pool_stats, is_async=True),
+)
+# 提交后不过期对象，响应序列化时不会触发隐式查询
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+
 def get_db():
     """依赖：获取 DB 会话。"""
     db = SessionLocal()
@@ -19,3 +53,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """依赖：获取异步 DB 会话。"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,12 +1,20 @@
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import auth, users, contracts, attachments, operations
+from app.api import auth, users, contracts, attachments, operations, jobs, internal, stats
 from app.config import settings
-from app.database import get_db
+from app.database import async_engine, engine, get_db
+from app import query_recorder
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.services.jobs import job_runner
+from app.services.oplog_partitions import ensure_partitions
+from app.services.password import password_hasher
+from app.services.stats import stats_refresher
+from app.services.pdf_engine import pdf_engine
 
 # 日志目录与文件
 _log_dir = Path(settings.log_dir)
@@ -25,20 +33,55 @@ logging.basicConfig(
 logger = logging.getLogger("app")
 logger.info("日志文件: %s", _log_file.resolve())
 
-app = FastAPI(title="合同管理系统 API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 补建操作日志分区；失败（如多进程同时启动）不影响服务，日志先写入兜底分区
+    try:
+        with engine.connect() as conn:
+            ensure_partitions(conn)
+    except Exception:
+        logger.exception("操作日志分区检查失败")
+    job_runner.start()
+    stats_refresher.start()
+    yield
+    stats_refresher.shutdown()
+    job_runner.shutdown()
+    pdf_engine.shutdown()
+    password_hasher.shutdown()
+
+
+app = FastAPI(title="合同管理系统 API", lifespan=lifespan)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 操作日志分页游标放在响应头，跨域时须显式暴露浏览器才能读取
+    expose_headers=["X-Next-Cursor"],
 )
+if settings.query_recorder != "off":
+    query_recorder.instrument_engine(engine)
+    query_recorder.instrument_engine(async_engine.sync_engine)
+    app.add_middleware(
+        query_recorder.QueryRecorderMiddleware,
+        mode=settings.query_recorder,
+        threshold=settings.query_repeat_threshold,
+    )
+# 最后添加的中间件在最外层，计时覆盖 CORS 等全部处理
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(contracts.router, prefix="/api")
 app.include_router(attachments.router, prefix="/api")
 app.include_router(operations.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+app.include_router(stats.router, prefix="/api")
+app.include_router(internal.router, prefix="/api")
 
 
 @app.get("/api/health")
@@ -0,0 +1,189 @@
+"""请求指标：纯 ASGI 中间件按路由模板记录请求数、延迟、响应大小与每请求数据库往返，输出 Prometheus 文本格式。
+
+指标按进程统计，多 worker 部署时由 Prometheus 分别抓取各进程再聚合。
+中间件与渲染都在事件循环线程中执行，计数无需加锁；数据库事件可能来自线程池，
+只写入当前请求自己的计数对象（经 contextvar 传递）。
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 延迟（秒）、响应大小（字节）、每请求查询数的桶上界
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# 未匹配任何路由（404 等）的请求统一归为一类，避免任意路径撑爆标签基数
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class _DbUsage:
+    """单个请求内的数据库往返次数与耗时。"""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+_current_db_usage: ContextVar[_DbUsage | None] = ContextVar("metrics_db_usage", default=None)
+
+
+class _RouteMetrics:
+    """单个 (method, route, status) 的累计值；各直方图的桶计数为非累积，渲染时再累加（最后一格为 +Inf）。"""
+
+    __slots__ = (
+        "count", "latency_counts", "latency_sum", "size_counts", "size_sum",
+        "query_counts", "query_sum", "db_seconds_sum",
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.size_counts = [0] * (len(SIZE_BUCKETS) + 1)
+        self.size_sum = 0
+        self.query_counts = [0] * (len(QUERY_BUCKETS) + 1)
+        self.query_sum = 0
+        self.db_seconds_sum = 0.0
+
+    def observe(self, seconds: float, size: int, usage: _DbUsage) -> None:
+        # 请求路径上的热点：直接更新各字段，不经中间对象
+        self.count += 1
+        self.latency_counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.latency_sum += seconds
+        self.size_counts[bisect_left(SIZE_BUCKETS, size)] += 1
+        self.size_sum += size
+        self.query_counts[bisect_left(QUERY_BUCKETS, usage.queries)] += 1
+        self.query_sum += usage.queries
+        self.db_seconds_sum += usage.seconds
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.routes: dict[tuple[str, str, int], _RouteMetrics] = {}
+        self.in_flight = 0
+
+    def record(self, method: str, route: str, status: int, seconds: float, size: int, usage: _DbUsage) -> None:
+        key = (method, route, status)
+        m = self.routes.get(key)
+        if m is None:
+            m = self.routes[key] = _RouteMetrics()
+        m.observe(seconds, size, usage)
+
+    def render(self, gauges: dict[str, list[tuple[dict, float]]] | None = None) -> str:
+        """Prometheus 文本格式（0.0.4）。gauges 为附加的 {指标名: [(标签, 值)]}。"""
+        items = sorted(self.routes.items())
+        lines = [
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), m in items:
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {m.count}")
+        for name, bounds, counts, total in (
+            ("http_request_duration_seconds", LATENCY_BUCKETS, "latency_counts", "latency_sum"),
+            ("http_response_size_bytes", SIZE_BUCKETS, "size_counts", "size_sum"),
+            ("http_request_db_queries", QUERY_BUCKETS, "query_counts", "query_sum"),
+        ):
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route, status), m in items:
+                labels = {"method": method, "route": route, "status": status}
+                _render_histogram(lines, name, bounds, getattr(m, counts), getattr(m, total), m.count, labels)
+        lines.append("# TYPE http_request_db_duration_seconds_total counter")
+        for (method, route, status), m in items:
+            lines.append(
+                f"http_request_db_duration_seconds_total{_labels(method=method, route=route, status=status)} "
+                f"{m.db_seconds_sum}"
+            )
+        for name, samples in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(**labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _render_histogram(lines: list[str], name: str, bounds: tuple, counts: list[int], total, count: int, labels: dict) -> None:
+    cumulative = 0
+    for bound, n in zip(bounds, counts):
+        cumulative += n
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {total}")
+    lines.append(f"{name}_count{_labels(**labels)} {count}")
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """纯 ASGI 中间件（不经 BaseHTTPMiddleware，流式响应不被缓冲），路由模板取自 FastAPI 写入的 scope["route"]。"""
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        registry = self.registry
+        usage = _DbUsage()
+        token = _current_db_usage.set(usage)
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            registry.in_flight -= 1
+            _current_db_usage.reset(token)
+            route = scope.get("route")
+            registry.record(
+                scope["method"], route.path if route is not None else UNMATCHED_ROUTE, status, elapsed, size, usage
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    usage = _current_db_usage.get()
+    if usage is not None:
+        usage.queries += 1
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_metrics_started", None)
+    usage = _current_db_usage.get()
+    if started is not None and usage is not None:
+        usage.seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine: Engine) -> None:
+    """统计该引擎在请求内执行的语句数与耗时（异步引擎传入 async_engine.sync_engine）。"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
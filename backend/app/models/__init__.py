@@ -1,7 +1,9 @@
 from app.models.user import User, UserRole
 from app.models.contract import Contract, ContractStatus
 from app.models.attachment import ContractAttachment
+from app.models.attachment_blob import AttachmentBlob
 from app.models.operation_log import ContractOperationLog
+from app.models.export_job import ExportJob, ExportJobKind, ExportJobStatus
 
 __all__ = [
     "User",
@@ -9,5 +11,9 @@ __all__ = [
     "Contract",
     "ContractStatus",
     "ContractAttachment",
+    "AttachmentBlob",
     "ContractOperationLog",
+    "ExportJob",
+    "ExportJobKind",
+    "ExportJobStatus",
 ]
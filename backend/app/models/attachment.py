@@ -15,6 +15,8 @@ class ContractAttachment(Base):
     file_name = Column(String(256), nullable=False)
     file_path = Column(String(512), nullable=False)  # 相对路径或 OSS key
     file_size = Column(BigInteger, nullable=False, default=0)
+    sha256 = Column(String(64), nullable=True)  # 内容哈希（十六进制），历史数据为空
+    blob_sha256 = Column(String(64), ForeignKey("attachment_blobs.sha256"), nullable=True, index=True)  # 去重存储时引用的内容块
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     contract = relationship("Contract", back_populates="attachments")
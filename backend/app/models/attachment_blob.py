@@ -0,0 +1,18 @@
+"""附件内容块（按 SHA-256 寻址，多个附件共享同一份文件）。"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, BigInteger, Integer, Index, text
+from app.database import Base
+
+
+class AttachmentBlob(Base):
+    __tablename__ = "attachment_blobs"
+    __table_args__ = (
+        Index("ix_attachment_blobs_unreferenced", "updated_at", postgresql_where=text("ref_count <= 0")),
+    )
+
+    sha256 = Column(String(64), primary_key=True)
+    file_path = Column(String(512), nullable=False)  # 存储 key：blobs/ab/cd/<sha256>
+    file_size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)  # 引用该内容的附件数，为 0 时由 GC 清理
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
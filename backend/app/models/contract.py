@@ -3,11 +3,20 @@ import enum
 import uuid
 from datetime import datetime, date
 from decimal import Decimal
-from sqlalchemy import Column, String, Enum, DateTime, Date, Numeric, ForeignKey, Text
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Enum, DateTime, Date, Numeric, ForeignKey, Text, Index, Computed
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 
+# 检索向量：各字段经 contract_search_bigrams（见迁移 004）切成二元组后生成 tsvector，
+# 标题与合同编号权重 A，甲乙方权重 B
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple'::regconfig, contract_search_bigrams(title)), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, contract_search_bigrams(contract_no)), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, contract_search_bigrams(party_a)), 'B') || "
+    "setweight(to_tsvector('simple'::regconfig, contract_search_bigrams(party_b)), 'B')"
+)
+
 
 class ContractStatus(str, enum.Enum):
     draft = "draft"                     # 草稿
@@ -21,6 +30,14 @@ class ContractStatus(str, enum.Enum):
 
 class Contract(Base):
     __tablename__ = "contracts"
+    __table_args__ = (
+        # 列表排序与游标分页：ORDER BY updated_at DESC, id DESC
+        Index("ix_contracts_updated_at_id", "updated_at", "id"),
+        # 按创建人 / 状态筛选后同序取页（迁移 011、013）
+        Index("ix_contracts_created_by_updated_at_id", "created_by", "updated_at", "id"),
+        Index("ix_contracts_status_updated_at_id", "status", "updated_at", "id"),
+        Index("ix_contracts_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(256), nullable=False)
@@ -35,6 +52,7 @@ class Contract(Base):
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True)))
 
     creator = relationship("User", foreign_keys=[created_by])
     attachments = relationship("ContractAttachment", back_populates="contract", cascade="all, delete-orphan")
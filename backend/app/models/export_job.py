@@ -0,0 +1,48 @@
+"""后台导出任务。"""
+import enum
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Enum, DateTime, Integer, ForeignKey, Text, Index, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+
+class ExportJobKind(str, enum.Enum):
+    contracts_pdf_zip = "contracts_pdf_zip"    # 合同 PDF 打包
+    contracts_csv = "contracts_csv"            # 合同列表 CSV
+    operation_logs_csv = "operation_logs_csv"  # 操作日志 CSV（仅超级管理员）
+
+
+class ExportJobStatus(str, enum.Enum):
+    queued = "queued"        # 排队中
+    running = "running"      # 执行中
+    succeeded = "succeeded"  # 已完成，可下载
+    failed = "failed"        # 失败
+
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    __table_args__ = (
+        # 恢复/调度只扫描未完成的任务
+        Index("ix_export_jobs_unfinished", "status", "created_at", postgresql_where=text("status IN ('queued', 'running')")),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = Column(Enum(ExportJobKind), nullable=False)
+    status = Column(Enum(ExportJobStatus), nullable=False, default=ExportJobStatus.queued)
+    params = Column(JSONB, nullable=False, default=dict)
+    progress = Column(Integer, nullable=False, default=0)  # 已处理条数
+    total = Column(Integer, nullable=True)                 # 总条数（未知时为空）
+    artifact_path = Column(String(512), nullable=True)     # 结果文件相对 job_artifact_dir 的路径（过期清理后为空）
+    artifact_name = Column(String(256), nullable=True)     # 下载文件名
+    error = Column(Text, nullable=True)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # 执行中定期刷新，超时视为进程已退出
+    claim_token = Column(UUID(as_uuid=True), nullable=True)  # 每次认领重新生成；心跳与结束只对当前持有者生效
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")  # 已认领执行的次数
+    finished_at = Column(DateTime, nullable=True)
+
+    creator = relationship("User", foreign_keys=[created_by])
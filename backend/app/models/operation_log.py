@@ -1,7 +1,7 @@
 """合同操作日志。"""
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -9,6 +9,14 @@ from app.database import Base
 
 class ContractOperationLog(Base):
     __tablename__ = "contract_operation_logs"
+    # 按 created_at 月分区（迁移 009，分区维护见 services/oplog_partitions.py）
+    __table_args__ = (
+        # 游标分页按 (created_at, id) 排序，过滤列在前（迁移 010）
+        Index("ix_contract_operation_logs_contract_created_id", "contract_id", "created_at", "id"),
+        Index("ix_contract_operation_logs_user_created_id", "user_id", "created_at", "id"),
+        Index("ix_contract_operation_logs_created_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     contract_id = Column(UUID(as_uuid=True), ForeignKey("contracts.id", ondelete="CASCADE"), nullable=False)
@@ -17,7 +25,8 @@ class ContractOperationLog(Base):
     from_status = Column(String(32), nullable=True)
     to_status = Column(String(32), nullable=True)
     remark = Column(Text, nullable=True)
-    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # 分区键须包含在主键中，主键为 (id, created_at)
+    created_at = Column(DateTime, primary_key=True, nullable=False, default=datetime.utcnow)
 
     contract = relationship("Contract", back_populates="operation_logs")
     user = relationship("User", lazy="joined")
@@ -0,0 +1,104 @@
+"""数据库连接池：按配置选择池类型，并统计取连接的等待时间、超时与新建连接数。"""
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+
+class PoolStats:
+    """单个引擎的累计统计，线程安全。"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "wait_seconds_total": self.wait_seconds,
+                "wait_seconds_max": self.max_wait_seconds,
+            }
+
+
+class _TimedPool:
+    """计时取连接（_do_get）的混入类；池满时的排队等待也计入。"""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return conn
+
+    def _create_connection(self):
+        self.stats.record_connect()
+        return super()._create_connection()
+
+
+def timed_pool_class(base: type[Pool], stats: PoolStats) -> type[Pool]:
+    # recreate()（engine.dispose）按 self.__class__ 重建，统计对象随类保留
+    return type(f"Timed{base.__name__}", (_TimedPool, base), {"stats": stats})
+
+
+def engine_pool_options(settings, stats: PoolStats, is_async: bool = False) -> dict:
+    """create_engine / create_async_engine 的连接池参数。"""
+    if settings.db_pgbouncer:
+        # PgBouncer（transaction 模式）负责复用连接，应用侧不保留空闲连接
+        return {"poolclass": timed_pool_class(NullPool, stats)}
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return {
+        "poolclass": timed_pool_class(base, stats),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_use_lifo": True,  # 优先复用最近归还的连接，空闲连接才会因 recycle 自然淘汰
+    }
+
+
+def pool_status(engine: Engine) -> dict:
+    """当前占用情况 + 累计统计。NullPool 没有容量概念，只返回累计统计。"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # overflow() 为负表示常驻连接尚未全部建立
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+    return status
@@ -0,0 +1,129 @@
+"""查询记录：按请求（或代码块）收集执行的 SQL，找出同一形状语句的重复执行（典型的 N+1 懒加载）。
+
+开发环境设置 QUERY_RECORDER=warn 记录警告，测试中设为 raise 使请求以 500 失败；
+默认 off 时不注册任何监听，生产无额外开销。测试代码也可直接使用 assert_max_queries / assert_no_repeated_queries。
+"""
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "warn", "raise")
+
+
+class QueryRecorder:
+    """记录语句文本（绑定参数以占位符出现，文本相同即形状相同）。"""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """执行次数不少于 threshold 的语句，按次数倒序。"""
+        return [(stmt, n) for stmt, n in Counter(self.statements).most_common() if n >= threshold]
+
+    def report(self, threshold: int) -> str:
+        lines = [f"共 {self.count} 条查询"]
+        for stmt, n in self.repeated(threshold):
+            lines.append(f"重复 {n} 次: {' '.join(stmt.split())[:300]}")
+        return "\n".join(lines)
+
+
+_current_recorder: ContextVar[QueryRecorder | None] = ContextVar("query_recorder", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        recorder.statements.append(statement)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """异步引擎传入 async_engine.sync_engine。重复调用不会重复注册。"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+@contextmanager
+def record_queries():
+    """在代码块内记录查询，产出 QueryRecorder；可嵌套，内层结束后外层继续记录。"""
+    recorder = QueryRecorder()
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+        outer = _current_recorder.get()
+        if outer is not None:
+            outer.statements.extend(recorder.statements)
+
+
+@contextmanager
+def assert_max_queries(n: int):
+    """代码块内查询数超过 n 时 AssertionError（用于给接口固定查询预算）。"""
+    with record_queries() as recorder:
+        yield recorder
+    if recorder.count > n:
+        raise AssertionError(f"期望最多 {n} 条查询，实际 {recorder.report(2)}")
+
+
+@contextmanager
+def assert_no_repeated_queries(threshold: int = 2):
+    """同一形状语句执行 threshold 次及以上时 AssertionError。"""
+    with record_queries() as recorder:
+        yield recorder
+    if recorder.repeated(threshold):
+        raise AssertionError(f"疑似 N+1 查询，{recorder.report(threshold)}")
+
+
+class QueryRecorderMiddleware:
+    """
+    按请求记录查询；同形状语句达到 threshold 次时按 mode 记录警告，或以 500 响应使请求失败。
+    raise 模式下响应整体暂存到检查之后再发出（仅用于测试），否则客户端在检查前已收到 200。
+    """
+
+    def __init__(self, app, mode: str = "warn", threshold: int = 5):
+        if mode not in MODES:
+            raise ValueError(f"query_recorder 取值应为 {'/'.join(MODES)}")
+        self.app = app
+        self.mode = mode
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.mode == "off":
+            await self.app(scope, receive, send)
+            return
+        held: list[dict] = []
+
+        async def hold(message):
+            held.append(message)
+
+        with record_queries() as recorder:
+            await self.app(scope, receive, hold if self.mode == "raise" else send)
+        if recorder.repeated(self.threshold):
+            route = scope.get("route")
+            where = f"{scope['method']} {route.path if route is not None else scope['path']}"
+            message = f"{where} 疑似 N+1 查询，{recorder.report(self.threshold)}"
+            logger.warning(message)
+            if self.mode == "raise":
+                body = message.encode("utf-8")
+                await send({
+                    "type": "http.response.start",
+                    "status": 500,
+                    "headers": [
+                        (b"content-type", b"text/plain; charset=utf-8"),
+                        (b"content-length", str(len(body)).encode()),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        for m in held:
+            await send(m)
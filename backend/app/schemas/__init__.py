@@ -5,8 +5,16 @@ from app.schemas.contract import (
     ContractUpdate,
     ContractResponse,
     ContractListResponse,
+    ContractBulkExportRequest,
+    ContractBulkActionRequest,
+    ContractBulkActionItem,
+    ContractBulkActionResponse,
+    ContractImportError,
+    ContractImportResponse,
 )
 from app.schemas.attachment import AttachmentResponse
+from app.schemas.export_job import ExportJobParams, ExportJobCreate, ExportJobResponse
+from app.schemas.stats import StatsBucket
 
 __all__ = [
     "Token",
@@ -20,5 +28,15 @@ __all__ = [
     "ContractUpdate",
     "ContractResponse",
     "ContractListResponse",
+    "ContractBulkExportRequest",
+    "ContractBulkActionRequest",
+    "ContractBulkActionItem",
+    "ContractBulkActionResponse",
+    "ContractImportError",
+    "ContractImportResponse",
     "AttachmentResponse",
+    "ExportJobParams",
+    "ExportJobCreate",
+    "ExportJobResponse",
+    "StatsBucket",
 ]
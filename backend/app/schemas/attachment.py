@@ -8,6 +8,7 @@ class AttachmentResponse(BaseModel):
     contract_id: UUID
     file_name: str
     file_size: int
+    sha256: str | None = None
     created_at: datetime
 
     class Config:
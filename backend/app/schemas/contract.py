@@ -1,7 +1,8 @@
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Literal
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from app.models.contract import ContractStatus
 from app.schemas.attachment import AttachmentResponse
 
@@ -64,3 +65,56 @@ class ContractListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ContractBulkExportRequest(BaseModel):
+    """批量导出：传 ids 时按 id 导出，否则按与列表相同的筛选条件导出。"""
+    ids: list[UUID] | None = None
+    keyword: str | None = None
+    status_filter: ContractStatus | None = None
+    sign_date_from: date | None = None
+    sign_date_to: date | None = None
+
+
+class ContractBulkActionRequest(BaseModel):
+    """批量操作：action 为审批流动作（见 services/workflow.py）或 delete。"""
+    ids: list[UUID] = Field(min_length=1)
+    action: Literal[
+        "submit",
+        "withdraw_creator",
+        "approve_finance",
+        "reject_finance",
+        "withdraw_finance",
+        "approve_admin",
+        "reject_admin",
+        "delete",
+    ]
+    remark: str | None = None
+
+
+class ContractBulkActionItem(BaseModel):
+    id: str
+    success: bool
+    status: ContractStatus | None = None  # 操作后的状态，删除时为空
+    code: int  # 与单个接口一致的状态码
+    detail: str | None = None
+
+
+class ContractBulkActionResponse(BaseModel):
+    action: str
+    succeeded: int
+    failed: int
+    results: list[ContractBulkActionItem]
+
+
+class ContractImportError(BaseModel):
+    row: int  # 文件中的行号（含表头，从 1 开始）
+    message: str
+
+
+class ContractImportResponse(BaseModel):
+    total: int
+    imported: int
+    failed: int
+    committed: bool  # 是否已写入；有错误且未选择跳过、或仅校验时为 false
+    errors: list[ContractImportError]
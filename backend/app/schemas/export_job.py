@@ -0,0 +1,38 @@
+from datetime import date, datetime
+from uuid import UUID
+from pydantic import BaseModel
+from app.models.contract import ContractStatus
+from app.models.export_job import ExportJobKind, ExportJobStatus
+
+
+class ExportJobParams(BaseModel):
+    """导出参数：合同类导出沿用列表筛选条件（PDF 打包还可传 ids），日志导出可按合同/用户过滤。"""
+    ids: list[UUID] | None = None
+    keyword: str | None = None
+    status_filter: ContractStatus | None = None
+    sign_date_from: date | None = None
+    sign_date_to: date | None = None
+    contract_id: UUID | None = None
+    user_id: UUID | None = None
+
+
+class ExportJobCreate(BaseModel):
+    kind: ExportJobKind
+    params: ExportJobParams = ExportJobParams()
+
+
+class ExportJobResponse(BaseModel):
+    id: UUID
+    kind: ExportJobKind
+    status: ExportJobStatus
+    progress: int
+    total: int | None
+    attempts: int
+    artifact_name: str | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,9 @@
+from decimal import Decimal
+from pydantic import BaseModel
+
+
+class StatsBucket(BaseModel):
+    bucket: str  # 分组键：状态值 / YYYY-MM / 用户 id / 甲乙方名称
+    label: str  # 展示名：创建人维度为用户名，其余同 bucket
+    count: int
+    amount: Decimal
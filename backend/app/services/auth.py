@@ -1,26 +1,39 @@
 """认证：密码校验、JWT 生成与解析。"""
 from datetime import datetime, timedelta
 from uuid import UUID
-import bcrypt
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import TTLCache
 from app.config import settings
-from app.database import get_db
+from app.database import AsyncSessionLocal
 from app.models.user import User, UserRole
 from app.schemas.auth import UserInToken
+from app.services.password import password_hasher
 
 security = HTTPBearer(auto_error=False)
 
+# 已认证用户缓存，key 为用户 id 字符串
+_user_cache = TTLCache(maxsize=settings.user_cache_size, ttl=settings.user_cache_ttl_seconds)
+
 
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return password_hasher.hash(password)
 
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+    return password_hasher.verify(plain, hashed)
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hasher.hash_async(password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    return await password_hasher.verify_async(plain, hashed)
 
 
 def create_access_token(user_id: UUID, username: str, role: UserRole) -> str:
@@ -50,9 +63,29 @@ def decode_token(token: str) -> UserInToken | None:
         return None
 
 
-def get_current_user(
+def invalidate_user_cache(user_id: UUID | str) -> None:
+    """用户信息变更（角色、密码、删除）后调用。"""
+    _user_cache.pop(str(user_id))
+
+
+async def _load_user(user_id: str) -> User | None:
+    """
+    按 id 取用户：命中缓存时不创建数据库会话；未命中时查询后与会话分离再缓存。
+    缓存中的对象为只读快照，需要修改时请在自己的会话中重新加载。
+    """
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+    async with AsyncSessionLocal() as db:
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+        if user is not None:
+            db.expunge(user)
+            _user_cache.set(user_id, user)
+        return user
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
-    db: Session = Depends(get_db),
 ) -> User:
     if not credentials or credentials.scheme != "Bearer":
         raise HTTPException(
@@ -65,7 +98,7 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="认证无效或已过期",
         )
-    user = db.query(User).filter(User.id == payload.id).first()
+    user = await _load_user(payload.id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -74,7 +107,7 @@ def get_current_user(
     return user
 
 
-def require_super_admin(current_user: User = Depends(get_current_user)) -> User:
+async def require_super_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != UserRole.super_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -85,9 +118,9 @@ def require_super_admin(current_user: User = Depends(get_current_user)) -> User:
 
 class AuthService:
     @staticmethod
-    def login(db: Session, username: str, password: str) -> tuple[str, User]:
-        user = db.query(User).filter(User.username == username).first()
-        if not user or not verify_password(password, user.password_hash):
+    async def login(db: AsyncSession, username: str, password: str) -> tuple[str, User]:
+        user = (await db.execute(select(User).where(User.username == username))).scalar_one_or_none()
+        if not user or not await verify_password_async(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="用户名或密码错误",
@@ -96,13 +129,16 @@ class AuthService:
         return token, user
 
     @staticmethod
-    def change_password(
-        db: Session, user: User, current_password: str, new_password: str
+    async def change_password(
+        db: AsyncSession, user: User, current_password: str, new_password: str
     ) -> None:
-        if not verify_password(current_password, user.password_hash):
+        # user 可能是缓存中的分离对象，在当前会话中重新加载后再修改
+        db_user = await db.get(User, user.id)
+        if not db_user or not await verify_password_async(current_password, db_user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="当前密码错误",
             )
-        user.password_hash = hash_password(new_password)
-        db.commit()
+        db_user.password_hash = await hash_password_async(new_password)
+        await db.commit()
+        invalidate_user_cache(user.id)
@@ -0,0 +1,102 @@
+"""附件内容寻址存储：按 SHA-256 去重、引用计数与垃圾回收。"""
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, literal_column, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.models.attachment_blob import AttachmentBlob
+from app.storage import Storage, StagedFile
+
+logger = logging.getLogger(__name__)
+
+
+_PENDING_PROMOTES = "pending_promotes"
+
+
+def blob_key(sha256: str) -> str:
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def promote_after_commit(db: Session, storage: Storage, staged: StagedFile, key: str) -> None:
+    """事务提交后再把暂存文件移到 key；事务回滚或未提交即关闭时丢弃暂存文件，不在存储中留下无行引用的文件。"""
+    db.info.setdefault(_PENDING_PROMOTES, []).append((storage, staged, key))
+
+
+@event.listens_for(Session, "after_commit")
+def _promote_pending(session: Session) -> None:
+    for storage, staged, key in session.info.pop(_PENDING_PROMOTES, ()):
+        try:
+            storage.promote(staged, key)
+        except Exception:
+            # 行已提交而文件缺失：同内容再次上传时会重新落盘
+            logger.exception("附件落盘失败: %s", key)
+            storage.discard(staged)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction: SessionTransaction) -> None:
+    # 提交时 after_commit 先于此事件触发并已取走；剩下的属于回滚或未提交的最外层事务
+    if transaction.parent is not None:
+        return
+    for storage, staged, _ in session.info.pop(_PENDING_PROMOTES, ()):
+        storage.discard(staged)
+
+
+def acquire_blob(db: Session, storage: Storage, staged: StagedFile) -> str:
+    """
+    为暂存文件获取一个引用：内容块不存在则建行并在提交后落盘，已存在则引用数 +1 并丢弃暂存文件。
+    返回存储 key。调用方负责提交事务。
+    """
+    key = blob_key(staged.sha256)
+    stmt = (
+        insert(AttachmentBlob)
+        .values(sha256=staged.sha256, file_path=key, file_size=staged.size, ref_count=1)
+        .on_conflict_do_update(
+            index_elements=[AttachmentBlob.sha256],
+            set_={"ref_count": AttachmentBlob.ref_count + 1, "updated_at": datetime.utcnow()},
+        )
+        .returning(literal_column("xmax = 0").label("inserted"))
+    )
+    # upsert 持有该行锁直到事务结束，GC 此时无法删除同一内容块，之后再检查文件是否存在才是安全的
+    inserted = db.execute(stmt).scalar()
+    if not inserted and storage.exists(key):
+        storage.discard(staged)
+    else:
+        promote_after_commit(db, storage, staged, key)
+    return key
+
+
+def release_blobs(db: Session, sha256s: list[str]) -> None:
+    """附件删除时扣减引用数（同一内容可能被同一合同引用多次）。调用方负责提交事务。"""
+    for sha256, n in Counter(s for s in sha256s if s).items():
+        db.execute(
+            update(AttachmentBlob)
+            .where(AttachmentBlob.sha256 == sha256)
+            .values(ref_count=AttachmentBlob.ref_count - n, updated_at=datetime.utcnow())
+        )
+
+
+def collect_garbage(db: Session, storage: Storage, grace_seconds: int, batch_size: int = 500) -> int:
+    """删除引用数为 0 且超过宽限期的内容块，返回删除个数。"""
+    cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+    removed = 0
+    while True:
+        blobs = (
+            db.query(AttachmentBlob)
+            .filter(AttachmentBlob.ref_count <= 0, AttachmentBlob.updated_at < cutoff)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not blobs:
+            return removed
+        for blob in blobs:
+            # 先删文件再删行：若提交失败，行仍在而文件缺失，下次上传同内容时会重新落盘
+            storage.delete(blob.file_path)
+            db.delete(blob)
+        db.commit()
+        removed += len(blobs)
+        logger.info("已清理 %d 个无引用附件内容块", removed)
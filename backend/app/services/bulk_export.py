@@ -0,0 +1,130 @@
+"""批量导出合同 PDF：并行渲染，按完成顺序流式写入 ZIP。"""
+import io
+import logging
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator
+from uuid import UUID
+
+from app.config import settings
+from app.services.pdf import contract_snapshot
+from app.services.pdf_cache import pdf_cache
+from app.services.pdf_engine import pdf_engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PdfJob:
+    """单个合同的渲染任务；id/updated_at 同时用作 PDF 缓存 key。"""
+
+    id: UUID
+    updated_at: datetime
+    filename: str
+    snapshot: dict = field(repr=False)
+
+
+def build_pdf_jobs(contracts: Iterable) -> list[PdfJob]:
+    """在数据库会话有效期内把合同转为渲染任务，之后的流式输出不再访问数据库。"""
+    jobs = []
+    used: set[str] = set()
+    for c in contracts:
+        name = f"合同_{c.contract_no}.pdf"
+        if name in used:
+            # 合同编号不唯一，重名时追加 id 区分
+            name = f"合同_{c.contract_no}_{c.id.hex[:8]}.pdf"
+        used.add(name)
+        jobs.append(PdfJob(id=c.id, updated_at=c.updated_at, filename=name, snapshot=contract_snapshot(c)))
+    return jobs
+
+
+class _ChunkSink(io.RawIOBase):
+    """不可 seek 的写入端，ZipFile 会改用 data descriptor，写入的数据可随时取走。"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _done(data: bytes) -> Future:
+    f: Future = Future()
+    f.set_result(data)
+    return f
+
+
+def iter_pdf_zip(jobs: list[PdfJob], on_progress=None) -> Iterator[bytes]:
+    """
+    产出 ZIP 字节流。同时在途的渲染任务不超过 bulk_export_window，内存占用与合同总数无关。
+    渲染失败或超时的合同记入 ZIP 末尾的“导出失败清单.txt”。on_progress(done, total) 每完成一个调用一次。
+    """
+    sink = _ChunkSink()
+    zf = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    # future -> (任务, 是否来自缓存, 截止时间)
+    pending: dict[Future, tuple[PdfJob, bool, float]] = {}
+    failures: list[str] = []
+    queue = iter(jobs)
+    finished = 0
+    try:
+        while True:
+            while len(pending) < settings.bulk_export_window:
+                job = next(queue, None)
+                if job is None:
+                    break
+                deadline = time.monotonic() + settings.pdf_render_timeout_seconds
+                cached = pdf_cache.get(job)
+                if cached is not None:
+                    pending[_done(cached)] = (job, True, deadline)
+                else:
+                    pending[pdf_engine.submit_snapshot(job.snapshot)] = (job, False, deadline)
+            if not pending:
+                break
+            timeout = max(0.0, min(d for _, _, d in pending.values()) - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            expired = [] if done else [f for f, (_, _, d) in pending.items() if d <= time.monotonic()]
+            if expired:
+                # 超时按失败处理并继续，保证 ZIP 能正常收尾；卡住的渲染进程由引擎回收
+                pdf_engine.recycle()
+            for future in [*done, *expired]:
+                job, from_cache, _ = pending.pop(future)
+                if future in done:
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        logger.warning("批量导出渲染失败: %s", job.id, exc_info=True)
+                        failures.append(f"{job.filename}\t{e}")
+                        data = None
+                else:
+                    future.cancel()
+                    logger.warning("批量导出渲染超时: %s", job.id)
+                    failures.append(f"{job.filename}\t渲染超时")
+                    data = None
+                if data is not None:
+                    if not from_cache:
+                        pdf_cache.put(job, data)
+                    zf.writestr(job.filename, data)
+                    yield sink.drain()
+                finished += 1
+                if on_progress:
+                    on_progress(finished, len(jobs))
+        if failures:
+            zf.writestr("导出失败清单.txt", "\n".join(failures).encode("utf-8"))
+        zf.close()
+        yield sink.drain()
+    finally:
+        # 客户端断开时取消尚未开始的渲染
+        for future in pending:
+            future.cancel()
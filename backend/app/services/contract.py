@@ -1,15 +1,31 @@
 """合同 CRUD、审批流与操作日志。"""
 from uuid import UUID
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import delete, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
+from app.config import settings
 from app.models.user import User, UserRole
+from app.models.attachment import ContractAttachment
 from app.models.contract import Contract, ContractStatus
 from app.models.operation_log import ContractOperationLog
 from app.schemas.contract import ContractCreate, ContractUpdate
+from app.services.blob import release_blobs
+from app.services.counting import count_total
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.pdf_cache import pdf_cache
+from app.services.search import keyword_filter
+from app.services.workflow import TRANSITIONS, apply_transition, check_role
+
+
+# 各读取路径声明的关联加载方式，响应组装时不再触发懒加载：
+# 详情（含新建、编辑、审批后的返回）读取创建人与附件，附件为一对多，用 selectinload 单独一条 IN 查询，
+# 避免 joinedload 按附件数放大结果行；列表与导出只读创建人
+CONTRACT_DETAIL_LOAD = (joinedload(Contract.creator), selectinload(Contract.attachments))
+CONTRACT_LIST_LOAD = (joinedload(Contract.creator),)
 
 
 def _log(db: Session, contract_id: UUID, user_id: UUID, action: str, from_status: str | None = None, to_status: str | None = None, remark: str | None = None) -> None:
@@ -58,44 +74,124 @@ class ContractService:
         return Contract.created_by == user.id
 
     @staticmethod
-    def list_contracts(
+    def filtered_query(
         db: Session,
         user: User,
-        skip: int = 0,
-        limit: int = 20,
         keyword: str | None = None,
         status_filter: ContractStatus | None = None,
         sign_date_from: date | None = None,
         sign_date_to: date | None = None,
     ):
-        q = db.query(Contract).options(joinedload(Contract.creator))
+        """按列表筛选条件与数据权限构造查询（未排序），返回 (query, 相关度表达式或 None)。"""
+        q = db.query(Contract)
         f = ContractService._list_filter(user)
         if f is not None:
             q = q.filter(f)
-        if keyword:
-            q = q.filter(
-                or_(
-                    Contract.title.ilike(f"%{keyword}%"),
-                    Contract.contract_no.ilike(f"%{keyword}%"),
-                    Contract.party_a.ilike(f"%{keyword}%"),
-                    Contract.party_b.ilike(f"%{keyword}%"),
-                )
-            )
+        rank = None
+        if keyword and keyword.strip():
+            clause, rank = keyword_filter(keyword)
+            q = q.filter(clause)
         if status_filter is not None:
             q = q.filter(Contract.status == status_filter)
         if sign_date_from is not None:
             q = q.filter(Contract.sign_date >= sign_date_from)
         if sign_date_to is not None:
             q = q.filter(Contract.sign_date <= sign_date_to)
-        total = q.count()
-        items = q.order_by(Contract.updated_at.desc()).offset(skip).limit(limit).all()
-        return total, items
+        return q, rank
+
+    @staticmethod
+    def list_contracts(
+        db: Session,
+        user: User,
+        skip: int = 0,
+        limit: int = 20,
+        keyword: str | None = None,
+        status_filter: ContractStatus | None = None,
+        sign_date_from: date | None = None,
+        sign_date_to: date | None = None,
+        cursor: str | None = None,
+        order: str | None = None,
+        include_total: bool = True,
+    ):
+        """
+        分页查询合同，按 (updated_at, id) 倒序。
+        传入 cursor 时走 keyset 分页（忽略 skip），否则沿用 offset 分页。
+        有关键词时默认按相关度排序（order="relevance"，仅支持 offset 分页）；
+        order="updated" 或传入 cursor 时按更新时间排序。
+        返回 (total, total_exact, items)，总数策略见 count_total。
+        """
+        q, rank = ContractService.filtered_query(db, user, keyword, status_filter, sign_date_from, sign_date_to)
+        scope = str(user.id) if ContractService._list_filter(user) is not None else "*"
+        cache_key = ("contracts", scope, keyword, status_filter, sign_date_from, sign_date_to)
+        total, total_exact = count_total(db, q, cache_key, include_total)
+        q = q.options(*CONTRACT_LIST_LOAD)
+        if rank is not None and not cursor and ContractService.resolve_order(keyword, order) == "relevance":
+            q = q.order_by(rank.desc(), Contract.updated_at.desc(), Contract.id.desc())
+        else:
+            q = q.order_by(Contract.updated_at.desc(), Contract.id.desc())
+        if cursor:
+            updated_at, last_id = decode_cursor(cursor)
+            q = q.filter(tuple_(Contract.updated_at, Contract.id) < (updated_at, last_id))
+        else:
+            q = q.offset(skip)
+        items = q.limit(limit).all()
+        return total, total_exact, items
+
+    @staticmethod
+    def list_for_export(
+        db: Session,
+        user: User,
+        ids: list[UUID] | None = None,
+        keyword: str | None = None,
+        status_filter: ContractStatus | None = None,
+        sign_date_from: date | None = None,
+        sign_date_to: date | None = None,
+        max_rows: int = 1000,
+    ) -> list[Contract]:
+        """批量导出的合同集合（受数据权限约束，无权查看的 id 直接忽略），超过 max_rows 返回 400。"""
+        q, _ = ContractService.filtered_query(db, user, keyword, status_filter, sign_date_from, sign_date_to)
+        if ids is not None:
+            q = q.filter(Contract.id.in_(ids))
+        items = (
+            q.options(*CONTRACT_LIST_LOAD)
+            .order_by(Contract.updated_at.desc(), Contract.id.desc())
+            .limit(max_rows + 1)
+            .all()
+        )
+        if len(items) > max_rows:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"单次最多导出 {max_rows} 份合同，请缩小筛选范围",
+            )
+        return items
+
+    @staticmethod
+    def resolve_order(keyword: str | None, order: str | None) -> str:
+        if order:
+            return order
+        return "relevance" if keyword and keyword.strip() else "updated"
+
+    @staticmethod
+    def next_cursor(items: list[Contract], limit: int, order: str = "updated") -> str | None:
+        """满页时返回下一页游标，否则返回 None（已到末页或按相关度排序）。"""
+        if order != "updated" or len(items) < limit:
+            return None
+        last = items[-1]
+        return encode_cursor(last.updated_at, last.id)
+
+    @staticmethod
+    def next_log_cursor(logs: list[ContractOperationLog], limit: int | None) -> str | None:
+        """操作日志满页时返回下一页游标。"""
+        if limit is None or len(logs) < limit:
+            return None
+        last = logs[-1]
+        return encode_cursor(last.created_at, last.id)
 
     @staticmethod
     def get_contract(db: Session, contract_id: UUID, user: User) -> Contract:
         contract = (
             db.query(Contract)
-            .options(joinedload(Contract.creator))
+            .options(*CONTRACT_DETAIL_LOAD)
             .filter(Contract.id == contract_id)
             .first()
         )
@@ -132,11 +228,10 @@ class ContractService:
             created_by=user.id,
         )
         db.add(contract)
+        db.flush()  # 生成 id；合同与创建日志在同一事务提交
+        _log(db, contract.id, user.id, "create", None, status_val.value)
         db.commit()
-        db.refresh(contract)
-        _log(db, contract.id, user.id, "create", None, contract.status.value)
-        db.commit()
-        return contract
+        return ContractService.get_contract(db, contract.id, user)
 
     @staticmethod
     def update_contract(
@@ -155,11 +250,11 @@ class ContractService:
                 setattr(contract, k, Decimal(str(v)))
             else:
                 setattr(contract, k, v)
-        db.commit()
-        db.refresh(contract)
         _log(db, contract.id, user.id, "edit", from_status, contract.status.value)
         db.commit()
-        return contract
+        pdf_cache.invalidate(contract.id)
+        # 重新读取：提交后属性已过期，按详情加载方式一次取回 updated_at 与关联
+        return ContractService.get_contract(db, contract_id, user)
 
     @staticmethod
     def delete_contract(db: Session, contract_id: UUID, user: User) -> None:
@@ -174,148 +269,218 @@ class ContractService:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="仅草稿或已驳回的合同可删除",
             )
+        release_blobs(db, [a.blob_sha256 for a in contract.attachments])
         db.delete(contract)
         db.commit()
+        pdf_cache.invalidate(contract_id)
 
     @staticmethod
-    def submit_contract(db: Session, contract_id: UUID, user: User) -> Contract:
+    def _transition(db: Session, contract_id: UUID, user: User, action: str, remark: str | None = None) -> Contract:
+        """按迁移表执行状态变更；未更新到行时再查询合同，区分 404 / 403 / 409（状态已被改变）。"""
+        t = TRANSITIONS[action]
+        check_role(t, user)
+        if apply_transition(db, t, [contract_id], user, remark):
+            db.commit()
+            pdf_cache.invalidate(contract_id)
+            return ContractService.get_contract(db, contract_id, user)
+        db.rollback()
         contract = ContractService.get_contract(db, contract_id, user)
-        if str(contract.created_by) != str(user.id):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅创建人可提交")
-        if contract.status != ContractStatus.draft:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="仅草稿可提交审批")
-        from_status = contract.status.value
-        contract.status = ContractStatus.pending_finance
-        db.commit()
-        db.refresh(contract)
-        _log(db, contract.id, user.id, "submit", from_status, contract.status.value)
-        db.commit()
-        return contract
+        if t.creator_only and str(contract.created_by) != str(user.id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=t.forbidden_detail)
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=t.conflict_detail)
+
+    @staticmethod
+    def submit_contract(db: Session, contract_id: UUID, user: User) -> Contract:
+        return ContractService._transition(db, contract_id, user, "submit")
 
     @staticmethod
     def finance_approve(db: Session, contract_id: UUID, user: User, remark: str | None = None) -> Contract:
-        if user.role != UserRole.finance and user.role != UserRole.super_admin:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅财务可审批")
-        contract = ContractService.get_contract(db, contract_id, user)
-        if contract.status != ContractStatus.pending_finance:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="当前状态不允许财务审批")
-        from_status = contract.status.value
-        contract.status = ContractStatus.finance_approved
-        db.commit()
-        db.refresh(contract)
-        _log(db, contract.id, user.id, "approve_finance", from_status, contract.status.value, remark)
-        db.commit()
-        return contract
+        return ContractService._transition(db, contract_id, user, "approve_finance", remark)
 
     @staticmethod
     def finance_reject(db: Session, contract_id: UUID, user: User, remark: str | None = None) -> Contract:
-        if user.role != UserRole.finance and user.role != UserRole.super_admin:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅财务可驳回")
-        contract = ContractService.get_contract(db, contract_id, user)
-        if contract.status != ContractStatus.pending_finance:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="当前状态不允许财务驳回")
-        from_status = contract.status.value
-        contract.status = ContractStatus.rejected
-        db.commit()
-        db.refresh(contract)
-        _log(db, contract.id, user.id, "reject_finance", from_status, contract.status.value, remark)
-        db.commit()
-        return contract
+        return ContractService._transition(db, contract_id, user, "reject_finance", remark)
 
     @staticmethod
     def admin_approve(db: Session, contract_id: UUID, user: User, remark: str | None = None) -> Contract:
-        if user.role != UserRole.super_admin:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅超级管理员可终审")
-        contract = ContractService.get_contract(db, contract_id, user)
-        if contract.status != ContractStatus.finance_approved:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="当前状态不允许管理员审批")
-        from_status = contract.status.value
-        contract.status = ContractStatus.active
-        db.commit()
-        db.refresh(contract)
-        _log(db, contract.id, user.id, "approve_admin", from_status, contract.status.value, remark)
-        db.commit()
-        return contract
+        return ContractService._transition(db, contract_id, user, "approve_admin", remark)
 
     @staticmethod
     def admin_reject(db: Session, contract_id: UUID, user: User, remark: str | None = None) -> Contract:
-        if user.role != UserRole.super_admin:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅超级管理员可终审驳回")
-        contract = ContractService.get_contract(db, contract_id, user)
-        if contract.status != ContractStatus.finance_approved:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="当前状态不允许管理员驳回")
-        from_status = contract.status.value
-        contract.status = ContractStatus.rejected
-        db.commit()
-        db.refresh(contract)
-        _log(db, contract.id, user.id, "reject_admin", from_status, contract.status.value, remark)
-        db.commit()
-        return contract
+        return ContractService._transition(db, contract_id, user, "reject_admin", remark)
 
     @staticmethod
     def withdraw_by_creator(db: Session, contract_id: UUID, user: User) -> Contract:
-        contract = ContractService.get_contract(db, contract_id, user)
-        if str(contract.created_by) != str(user.id):
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅创建人可撤回")
-        if contract.status != ContractStatus.pending_finance:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="仅待财务审批状态可撤回")
-        from_status = contract.status.value
-        contract.status = ContractStatus.draft
-        db.commit()
-        db.refresh(contract)
-        _log(db, contract.id, user.id, "withdraw_creator", from_status, contract.status.value)
-        db.commit()
-        return contract
+        return ContractService._transition(db, contract_id, user, "withdraw_creator")
 
     @staticmethod
     def withdraw_by_finance(db: Session, contract_id: UUID, user: User) -> Contract:
-        if user.role != UserRole.finance and user.role != UserRole.super_admin:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅财务可撤回")
-        contract = ContractService.get_contract(db, contract_id, user)
-        if contract.status != ContractStatus.finance_approved:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="仅待管理员审批状态可撤回")
-        from_status = contract.status.value
-        contract.status = ContractStatus.pending_finance
-        db.commit()
-        db.refresh(contract)
-        _log(db, contract.id, user.id, "withdraw_finance", from_status, contract.status.value)
+        return ContractService._transition(db, contract_id, user, "withdraw_finance")
+
+    @staticmethod
+    def bulk_action(
+        db: Session, contract_ids: list[UUID], user: User, action: str, remark: str | None = None
+    ) -> list[dict]:
+        """
+        批量迁移或删除，一个事务内按集合执行；返回每个合同的结果
+        {"id", "success", "status", "code", "detail"}，顺序与请求一致。
+        """
+        ids = list(dict.fromkeys(contract_ids))
+        if len(ids) > settings.bulk_action_max_contracts:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"单次最多操作 {settings.bulk_action_max_contracts} 个合同",
+            )
+        if action == "delete":
+            done = ContractService._bulk_delete(db, ids, user)
+            new_status = None
+        else:
+            t = TRANSITIONS[action]
+            check_role(t, user)
+            done = apply_transition(db, t, ids, user, remark)
+            new_status = t.to_status
         db.commit()
-        return contract
+        for contract_id in done:
+            pdf_cache.invalidate(contract_id)
+
+        failed = [i for i in ids if i not in done]
+        rows = {}
+        if failed:
+            rows = {
+                r.id: r
+                for r in db.query(Contract.id, Contract.status, Contract.created_by).filter(Contract.id.in_(failed))
+            }
+        results = []
+        for contract_id in ids:
+            if contract_id in done:
+                results.append({"id": contract_id, "success": True, "status": new_status, "code": 200, "detail": None})
+                continue
+            code, detail = ContractService._bulk_failure(user, action, rows.get(contract_id))
+            results.append({"id": contract_id, "success": False, "status": None, "code": code, "detail": detail})
+        return results
 
     @staticmethod
-    def list_operation_logs_for_contract(db: Session, contract_id: UUID, user: User):
+    def _bulk_delete(db: Session, ids: list[UUID], user: User) -> set[UUID]:
+        """锁定有权删除的合同，扣减附件内容块引用后一次性删除（附件与日志由外键级联删除）。"""
+        if not ids or user.role == UserRole.finance:
+            return set()
+        q = db.query(Contract.id).filter(Contract.id.in_(ids))
+        if user.role != UserRole.super_admin:
+            q = q.filter(
+                Contract.created_by == user.id,
+                Contract.status.in_((ContractStatus.draft, ContractStatus.rejected)),
+            )
+        locked = [contract_id for (contract_id,) in q.with_for_update()]
+        if not locked:
+            return set()
+        shas = (
+            db.query(ContractAttachment.blob_sha256)
+            .filter(ContractAttachment.contract_id.in_(locked), ContractAttachment.blob_sha256.isnot(None))
+            .all()
+        )
+        release_blobs(db, [sha for (sha,) in shas])
+        db.execute(delete(Contract).where(Contract.id.in_(locked)), execution_options={"synchronize_session": False})
+        return set(locked)
+
+    @staticmethod
+    def _bulk_failure(user: User, action: str, row) -> tuple[int, str]:
+        """未成功的合同：按当前状态给出与单个接口一致的错误码与提示。"""
+        if row is None:
+            return status.HTTP_404_NOT_FOUND, "合同不存在"
+        if not ContractService._can_view_contract(user, row):
+            return status.HTTP_403_FORBIDDEN, "无权限查看该合同"
+        if action == "delete":
+            if not ContractService._can_manage_contract(user, row):
+                return status.HTTP_403_FORBIDDEN, "无权限删除该合同"
+            return status.HTTP_403_FORBIDDEN, "仅草稿或已驳回的合同可删除"
+        t = TRANSITIONS[action]
+        if t.creator_only and str(row.created_by) != str(user.id):
+            return status.HTTP_403_FORBIDDEN, t.forbidden_detail
+        return status.HTTP_409_CONFLICT, t.conflict_detail
+
+    @staticmethod
+    def list_operation_logs_for_contract(
+        db: Session, contract_id: UUID, user: User, cursor: str | None = None, limit: int | None = None
+    ):
+        """按时间正序返回合同的操作日志；传入 limit 时分页，cursor 为上一页最后一条之后。"""
         contract = ContractService.get_contract(db, contract_id, user)
-        logs = (
+        q = (
             db.query(ContractOperationLog)
             .options(joinedload(ContractOperationLog.user))
             .filter(ContractOperationLog.contract_id == contract_id)
-            .order_by(ContractOperationLog.created_at.asc())
-            .all()
+            .order_by(ContractOperationLog.created_at.asc(), ContractOperationLog.id.asc())
         )
-        return contract, logs
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            q = q.filter(tuple_(ContractOperationLog.created_at, ContractOperationLog.id) > (created_at, last_id))
+        if limit is not None:
+            q = q.limit(limit)
+        return contract, q.all()
 
     @staticmethod
     def list_operation_logs_global(
-        db: Session, user: User, contract_id: UUID | None = None, user_id: UUID | None = None, skip: int = 0, limit: int = 50
+        db: Session,
+        user: User,
+        contract_id: UUID | None = None,
+        user_id: UUID | None = None,
+        skip: int = 0,
+        limit: int = 50,
+        include_total: bool = True,
+        created_from: datetime | None = None,
+        created_to: datetime | None = None,
+        cursor: str | None = None,
     ):
+        """
+        按时间倒序返回 (total, total_exact, [(log, contract_no)])。
+        传入 cursor 时按 (created_at, id) 走 keyset 分页（忽略 skip），翻页深度不影响耗时；
+        日志表按 created_at 月分区，带时间范围查询时只扫描相关分区。
+        """
         if user.role != UserRole.super_admin:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅超级管理员可查看全局操作日志")
         q = (
             db.query(ContractOperationLog, Contract.contract_no)
             .join(Contract, ContractOperationLog.contract_id == Contract.id)
-            .options(joinedload(ContractOperationLog.user))
         )
         if contract_id is not None:
             q = q.filter(ContractOperationLog.contract_id == contract_id)
         if user_id is not None:
             q = q.filter(ContractOperationLog.user_id == user_id)
-        base_filter = db.query(ContractOperationLog).join(Contract, ContractOperationLog.contract_id == Contract.id)
-        if contract_id is not None:
-            base_filter = base_filter.filter(ContractOperationLog.contract_id == contract_id)
-        if user_id is not None:
-            base_filter = base_filter.filter(ContractOperationLog.user_id == user_id)
-        total = base_filter.count()
-        rows = q.order_by(ContractOperationLog.created_at.desc()).offset(skip).limit(limit).all()
+        if created_from is not None:
+            q = q.filter(ContractOperationLog.created_at >= created_from)
+        if created_to is not None:
+            q = q.filter(ContractOperationLog.created_at < created_to)
+        total, total_exact = count_total(
+            db, q, ("operation_logs", contract_id, user_id, created_from, created_to), include_total
+        )
+        q = q.options(joinedload(ContractOperationLog.user)).order_by(
+            ContractOperationLog.created_at.desc(), ContractOperationLog.id.desc()
+        )
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            q = q.filter(tuple_(ContractOperationLog.created_at, ContractOperationLog.id) < (created_at, last_id))
+        else:
+            q = q.offset(skip)
+        rows = q.limit(limit).all()
         # 返回 (log, contract_no) 列表，供 API 层组装
         items = [(row[0], row[1]) for row in rows]
-        return total, items
+        return total, total_exact, items
+
+    # ---------- 异步读接口：供 async def 路由使用 ----------
+    # 通过 AsyncSession.run_sync 在 asyncpg 连接上执行上面的同步查询，查询逻辑只维护一份。
+    # 返回的对象关联已预加载，事件循环中不能再触发懒加载。
+
+    @staticmethod
+    async def list_contracts_async(db: AsyncSession, user: User, *args, **kwargs):
+        return await db.run_sync(ContractService.list_contracts, user, *args, **kwargs)
+
+    @staticmethod
+    async def get_contract_async(db: AsyncSession, contract_id: UUID, user: User) -> Contract:
+        return await db.run_sync(ContractService.get_contract, contract_id, user)
+
+    @staticmethod
+    async def list_operation_logs_for_contract_async(db: AsyncSession, contract_id: UUID, user: User, **kwargs):
+        return await db.run_sync(ContractService.list_operation_logs_for_contract, contract_id, user, **kwargs)
+
+    @staticmethod
+    async def list_operation_logs_global_async(db: AsyncSession, user: User, **kwargs):
+        return await db.run_sync(ContractService.list_operation_logs_global, user, **kwargs)
@@ -0,0 +1,64 @@
+"""列表总数策略：小结果精确计数，大结果用规划器估算并按过滤条件缓存。"""
+import json
+from typing import Hashable
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.cache import TTLCache
+from app.config import settings
+
+_estimate_cache = TTLCache(maxsize=settings.count_cache_size, ttl=settings.count_cache_ttl_seconds)
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <stmt>，参数照常绑定。"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _planner_rows(db: Session, q: Query) -> int:
+    plan = db.execute(_Explain(q.statement)).scalar()
+    if isinstance(plan, str):
+        # asyncpg 不解析 json 类型，返回原始文本
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_total(
+    db: Session,
+    q: Query,
+    cache_key: Hashable,
+    include_total: bool = True,
+) -> tuple[int | None, bool]:
+    """
+    返回 (total, exact)。
+    先查 cache_key 的估算缓存：近期已知超过上限的过滤条件直接返回缓存的估算值，不再计数。
+    未命中时做带上限的计数（最多扫描 count_exact_limit + 1 行），不超过上限即为精确值（不缓存，保证写入后立即准确）；
+    超过上限时改用规划器估算行数，按 cache_key 缓存 count_cache_ttl_seconds 秒。
+    include_total=False 时不计数，返回 (None, False)。
+    """
+    if not include_total:
+        return None, False
+    cached = _estimate_cache.get(cache_key)
+    if cached is not None:
+        return cached, False
+    q = q.with_entities(literal_column("1")).order_by(None)
+    cap = settings.count_exact_limit
+    bounded = q.limit(cap + 1).subquery()
+    n = db.query(func.count()).select_from(bounded).scalar()
+    if n <= cap:
+        return n, True
+    estimate = max(_planner_rows(db, q), cap + 1)
+    _estimate_cache.set(cache_key, estimate)
+    return estimate, False
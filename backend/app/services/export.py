@@ -0,0 +1,175 @@
+"""合同列表与操作日志导出（CSV / XLSX）。"""
+import csv
+import io
+import tempfile
+from typing import BinaryIO, Callable, Iterable, Iterator, TextIO
+from uuid import UUID
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.database import SessionLocal
+from app.models.contract import Contract
+from app.models.operation_log import ContractOperationLog
+from app.models.user import User
+from app.services.contract import CONTRACT_LIST_LOAD, ContractService
+from app.services.pdf import _to_chinese_amount
+from app.services.streaming import CHUNK_SIZE
+
+# 每批从数据库取出的行数（服务端游标）
+FETCH_SIZE = 1000
+
+CONTRACT_HEADER = [
+    "合同编号", "标题", "甲方", "乙方", "金额", "金额大写",
+    "签订日期", "到期日", "状态", "创建人", "创建时间", "更新时间",
+]
+
+OPERATION_LOG_HEADER = ["时间", "合同编号", "操作人", "操作", "原状态", "新状态", "备注"]
+
+
+def _fmt(v) -> str:
+    return "" if v is None else str(v)
+
+
+def contract_row(c: Contract) -> list:
+    return [
+        c.contract_no,
+        c.title,
+        c.party_a,
+        c.party_b,
+        _fmt(c.amount),
+        _to_chinese_amount(c.amount),
+        _fmt(c.sign_date),
+        _fmt(c.expire_date),
+        c.status.value,
+        c.creator.username if c.creator else "",
+        c.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        c.updated_at.strftime("%Y-%m-%d %H:%M:%S"),
+    ]
+
+
+def contract_xlsx_row(c: Contract) -> list:
+    """XLSX 行：金额与日期保留原类型，Excel 中可直接计算与筛选。"""
+    return [
+        c.contract_no,
+        c.title,
+        c.party_a,
+        c.party_b,
+        c.amount,
+        _to_chinese_amount(c.amount),
+        c.sign_date,
+        c.expire_date,
+        c.status.value,
+        c.creator.username if c.creator else "",
+        c.created_at,
+        c.updated_at,
+    ]
+
+
+def iter_contract_rows(
+    db: Session, user: User, filters: dict, to_row: Callable[[Contract], list] = contract_row
+) -> Iterator[list]:
+    """按列表筛选条件逐行产出合同（服务端游标分批读取）。"""
+    q, _ = ContractService.filtered_query(
+        db,
+        user,
+        keyword=filters.get("keyword"),
+        status_filter=filters.get("status_filter"),
+        sign_date_from=filters.get("sign_date_from"),
+        sign_date_to=filters.get("sign_date_to"),
+    )
+    q = (
+        q.options(*CONTRACT_LIST_LOAD)
+        .order_by(Contract.updated_at.desc(), Contract.id.desc())
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+    for c in q:
+        yield to_row(c)
+
+
+def iter_operation_log_rows(
+    db: Session, contract_id: UUID | None = None, user_id: UUID | None = None
+) -> Iterator[list]:
+    q = (
+        db.query(ContractOperationLog, Contract.contract_no)
+        .join(Contract, ContractOperationLog.contract_id == Contract.id)
+        .options(joinedload(ContractOperationLog.user))
+    )
+    if contract_id is not None:
+        q = q.filter(ContractOperationLog.contract_id == contract_id)
+    if user_id is not None:
+        q = q.filter(ContractOperationLog.user_id == user_id)
+    q = q.order_by(ContractOperationLog.created_at.desc()).execution_options(yield_per=FETCH_SIZE)
+    for log, contract_no in q:
+        yield [
+            log.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            contract_no,
+            log.user.username if log.user else "",
+            log.action,
+            _fmt(log.from_status),
+            _fmt(log.to_status),
+            _fmt(log.remark),
+        ]
+
+
+def write_csv(fp: TextIO, header: list[str], rows: Iterable[list], on_row=None) -> int:
+    """写入 CSV（带 UTF-8 BOM 以便 Excel 正确识别中文），返回数据行数。"""
+    fp.write("\ufeff")
+    writer = csv.writer(fp)
+    writer.writerow(header)
+    n = 0
+    for row in rows:
+        writer.writerow(row)
+        n += 1
+        if on_row:
+            on_row(n)
+    return n
+
+
+def iter_csv_bytes(header: list[str], rows: Iterable[list], flush_rows: int = 500) -> Iterator[bytes]:
+    """逐块产出 CSV 字节（带 UTF-8 BOM），每 flush_rows 行输出一次。"""
+    buf = io.StringIO()
+    buf.write("\ufeff")
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    for n, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if n % flush_rows == 0:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue().encode("utf-8")
+
+
+def write_xlsx(fp: BinaryIO, header: list[str], rows: Iterable[list], title: str = "Sheet1") -> int:
+    """write_only 模式逐行写入 XLSX（行数据落临时文件，内存占用与行数无关），返回数据行数。"""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    ws.append(header)
+    n = 0
+    for row in rows:
+        ws.append(row)
+        n += 1
+    wb.save(fp)
+    return n
+
+
+def iter_contract_export(user: User, filters: dict, fmt: str) -> Iterator[bytes]:
+    """
+    流式导出合同列表。使用独立会话：请求依赖中的会话在流式响应开始前就已关闭。
+    CSV 边查边输出；XLSX 须整体打包，先写入临时文件再分块输出。
+    """
+    db = SessionLocal()
+    try:
+        if fmt == "csv":
+            yield from iter_csv_bytes(CONTRACT_HEADER, iter_contract_rows(db, user, filters))
+            return
+        with tempfile.TemporaryFile() as tmp:
+            write_xlsx(tmp, CONTRACT_HEADER, iter_contract_rows(db, user, filters, contract_xlsx_row), "合同列表")
+            db.rollback()  # 结束只读事务，释放服务端游标后再输出
+            tmp.seek(0)
+            while chunk := tmp.read(CHUNK_SIZE):
+                yield chunk
+    finally:
+        db.close()
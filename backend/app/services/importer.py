@@ -0,0 +1,237 @@
+"""合同批量导入（CSV / XLSX）：逐行流式读取、按 ContractCreate 校验，分批 COPY 写入合同与创建日志。"""
+import csv
+import io
+import logging
+import uuid
+import zipfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Iterator
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.contract import Contract, ContractStatus
+from app.models.user import User, UserRole
+from app.schemas.contract import ContractCreate
+
+logger = logging.getLogger(__name__)
+
+# 表头别名：既支持字段名，也支持导出 CSV 的中文表头，导出的文件可直接导回
+_HEADER_ALIASES = {
+    "title": "title", "标题": "title",
+    "contract_no": "contract_no", "合同编号": "contract_no",
+    "party_a": "party_a", "甲方": "party_a",
+    "party_b": "party_b", "乙方": "party_b",
+    "amount": "amount", "金额": "amount",
+    "sign_date": "sign_date", "签订日期": "sign_date",
+    "expire_date": "expire_date", "到期日": "expire_date",
+    "status": "status", "状态": "status",
+    "note": "note", "备注": "note",
+}
+
+_CONTRACT_COLUMNS = [
+    "id", "title", "contract_no", "party_a", "party_b", "amount", "sign_date", "expire_date",
+    "status", "note", "created_by", "created_at", "updated_at",
+]
+_LOG_COLUMNS = ["id", "contract_id", "user_id", "action", "from_status", "to_status", "created_at"]
+
+# 字符串列的长度上限，超长的行在校验阶段报错，避免整批 COPY 失败
+_MAX_LENGTHS = {
+    name: Contract.__table__.c[name].type.length
+    for name in ("title", "contract_no", "party_a", "party_b")
+}
+_MAX_AMOUNT = 10 ** 16  # Numeric(18, 2)
+_TEXT_FIELDS = {"title", "contract_no", "party_a", "party_b", "note"}
+
+# 结果中最多返回的错误行数
+MAX_REPORTED_ERRORS = 1000
+
+
+@dataclass
+class ImportResult:
+    total: int = 0
+    imported: int = 0
+    failed: int = 0
+    committed: bool = False
+    errors: list[dict] = field(default_factory=list)
+
+    def add_error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "message": message})
+
+
+# ---------- 读取 ----------
+
+def _normalize_header(header) -> list[str | None]:
+    return [_HEADER_ALIASES.get(str(h).strip()) if h is not None else None for h in header]
+
+
+def _iter_csv(fp: BinaryIO) -> Iterator[tuple[int, dict]]:
+    # utf-8-sig：兼容 Excel 另存的带 BOM 文件
+    text = io.TextIOWrapper(fp, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = _normalize_header(next(reader, []))
+    for values in reader:
+        if not any(v.strip() for v in values):
+            continue
+        yield reader.line_num, {k: v for k, v in zip(header, values) if k}
+
+
+def _iter_xlsx(fp: BinaryIO) -> Iterator[tuple[int, dict]]:
+    from openpyxl import load_workbook
+
+    # read_only 模式按行流式解析，不把整个工作表载入内存
+    wb = load_workbook(fp, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = _normalize_header(next(rows, ()))
+        for line, values in enumerate(rows, start=2):
+            if all(v is None or str(v).strip() == "" for v in values):
+                continue
+            yield line, {k: v for k, v in zip(header, values) if k}
+    finally:
+        wb.close()
+
+
+def iter_import_rows(fp: BinaryIO, filename: str) -> Iterator[tuple[int, dict]]:
+    """按扩展名选择解析器，产出 (行号, {字段: 原始值})。"""
+    name = filename.lower()
+    if name.endswith(".csv"):
+        return _iter_csv(fp)
+    if name.endswith(".xlsx"):
+        return _iter_xlsx(fp)
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="仅支持 CSV 或 XLSX 文件")
+
+
+# ---------- 校验 ----------
+
+def _clean(raw: dict) -> dict:
+    data = {}
+    for k, v in raw.items():
+        if isinstance(v, str):
+            v = v.strip()
+            if v == "":
+                v = None
+        elif isinstance(v, datetime):
+            v = v.date()  # Excel 日期单元格
+        elif k in _TEXT_FIELDS and isinstance(v, (int, float)):
+            # Excel 中纯数字的合同编号等会被读成数值
+            v = str(int(v)) if isinstance(v, float) and v.is_integer() else str(v)
+        if v is not None:
+            data[k] = v
+    return data
+
+
+def _format_errors(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+
+def validate_row(raw: dict) -> ContractCreate:
+    data = ContractCreate.model_validate(_clean(raw))
+    for name, limit in _MAX_LENGTHS.items():
+        if len(getattr(data, name)) > limit:
+            raise ValueError(f"{name}: 长度不能超过 {limit}")
+    if abs(data.amount) >= _MAX_AMOUNT:
+        raise ValueError("amount: 金额超出范围")
+    return data
+
+
+# ---------- 写入 ----------
+
+def _copy_value(v) -> str:
+    """COPY text 格式：NULL 写作 \\N，转义反斜杠与控制字符。"""
+    if v is None:
+        return "\\N"
+    if isinstance(v, ContractStatus):
+        v = v.value
+    return str(v).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def _copy(db: Session, table: str, columns: list[str], rows: list[tuple]) -> None:
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_value(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    # 与 ORM 会话共用同一连接与事务
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+    finally:
+        cursor.close()
+
+
+def _flush(db: Session, batch: list[ContractCreate], user: User) -> None:
+    now = datetime.utcnow()
+    contracts, logs = [], []
+    for data in batch:
+        # 与 create_contract 一致：只允许以草稿或已驳回状态录入
+        status_val = data.status if data.status in (ContractStatus.draft, ContractStatus.rejected) else ContractStatus.draft
+        contract_id = uuid.uuid4()
+        contracts.append((
+            contract_id, data.title, data.contract_no, data.party_a, data.party_b, data.amount,
+            data.sign_date, data.expire_date, status_val, data.note, user.id, now, now,
+        ))
+        logs.append((uuid.uuid4(), contract_id, user.id, "create", None, status_val.value, now))
+    _copy(db, "contracts", _CONTRACT_COLUMNS, contracts)
+    _copy(db, "contract_operation_logs", _LOG_COLUMNS, logs)
+
+
+def import_contracts(
+    db: Session,
+    fp: BinaryIO,
+    filename: str,
+    user: User,
+    skip_invalid: bool = False,
+    dry_run: bool = False,
+) -> ImportResult:
+    """
+    导入合同，所有批次在同一事务内写入，最后统一提交。
+    有校验错误时：skip_invalid=False（默认）整体回滚、不导入任何行；skip_invalid=True 跳过错误行。
+    dry_run 只校验不写入。
+    """
+    if user.role == UserRole.finance:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="财务角色不能创建合同")
+    result = ImportResult()
+    batch: list[ContractCreate] = []
+    try:
+        for line, raw in iter_import_rows(fp, filename):
+            result.total += 1
+            try:
+                batch.append(validate_row(raw))
+            except ValidationError as e:
+                result.add_error(line, _format_errors(e))
+                continue
+            except ValueError as e:
+                result.add_error(line, str(e))
+                continue
+            if len(batch) >= settings.import_batch_size:
+                # 已有错误且不跳过时结果必然回滚，只继续校验
+                if not dry_run and (skip_invalid or not result.failed):
+                    _flush(db, batch, user)
+                result.imported += len(batch)
+                batch.clear()
+        if batch:
+            if not dry_run and (skip_invalid or not result.failed):
+                _flush(db, batch, user)
+            result.imported += len(batch)
+    except (UnicodeDecodeError, csv.Error, zipfile.BadZipFile) as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"文件解析失败: {e}")
+    except Exception:
+        db.rollback()
+        raise
+
+    if dry_run or (result.failed and not skip_invalid):
+        db.rollback()
+        if not dry_run:
+            result.imported = 0
+        return result
+    db.commit()
+    result.committed = True
+    logger.info("合同导入完成: 用户 %s，导入 %d 行，失败 %d 行", user.username, result.imported, result.failed)
+    return result
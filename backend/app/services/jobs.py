@@ -0,0 +1,395 @@
+"""后台导出任务：提交、持久化、本地线程池执行与进度上报。"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.export_job import ExportJob, ExportJobKind, ExportJobStatus
+from app.models.user import User, UserRole
+from app.schemas.export_job import ExportJobCreate, ExportJobParams
+from app.services.bulk_export import build_pdf_jobs, iter_pdf_zip
+from app.services.contract import ContractService
+from app.services.export import (
+    CONTRACT_HEADER,
+    OPERATION_LOG_HEADER,
+    iter_contract_rows,
+    iter_operation_log_rows,
+    write_csv,
+)
+
+logger = logging.getLogger(__name__)
+
+ProgressFn = Callable[[int, int | None], None]
+
+MEDIA_TYPES = {
+    ExportJobKind.contracts_pdf_zip: "application/zip",
+    ExportJobKind.contracts_csv: "text/csv; charset=utf-8",
+    ExportJobKind.operation_logs_csv: "text/csv; charset=utf-8",
+}
+
+
+def _artifact_dir() -> Path:
+    path = Path(settings.job_artifact_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# ---------- 各类任务的执行函数：写入 dest，返回下载文件名 ----------
+
+def _run_contracts_pdf_zip(db: Session, user: User, params: ExportJobParams, dest: Path, progress: ProgressFn) -> str:
+    contracts = ContractService.list_for_export(
+        db,
+        user,
+        ids=params.ids,
+        keyword=params.keyword,
+        status_filter=params.status_filter,
+        sign_date_from=params.sign_date_from,
+        sign_date_to=params.sign_date_to,
+        max_rows=settings.job_export_max_contracts,
+    )
+    jobs = build_pdf_jobs(contracts)
+    progress(0, len(jobs))
+    with open(dest, "wb") as f:
+        for chunk in iter_pdf_zip(jobs, on_progress=progress):
+            f.write(chunk)
+    return "合同导出.zip"
+
+
+def _run_contracts_csv(db: Session, user: User, params: ExportJobParams, dest: Path, progress: ProgressFn) -> str:
+    with open(dest, "w", encoding="utf-8", newline="") as f:
+        write_csv(f, CONTRACT_HEADER, iter_contract_rows(db, user, params.model_dump()), lambda n: progress(n, None))
+    return "合同列表.csv"
+
+
+def _run_operation_logs_csv(db: Session, user: User, params: ExportJobParams, dest: Path, progress: ProgressFn) -> str:
+    rows = iter_operation_log_rows(db, contract_id=params.contract_id, user_id=params.user_id)
+    with open(dest, "w", encoding="utf-8", newline="") as f:
+        write_csv(f, OPERATION_LOG_HEADER, rows, lambda n: progress(n, None))
+    return "操作日志.csv"
+
+
+_HANDLERS = {
+    ExportJobKind.contracts_pdf_zip: (_run_contracts_pdf_zip, "zip"),
+    ExportJobKind.contracts_csv: (_run_contracts_csv, "csv"),
+    ExportJobKind.operation_logs_csv: (_run_operation_logs_csv, "csv"),
+}
+
+
+class _JobLease:
+    """
+    持有一次认领：用独立会话写入进度（至多每秒一次）与心跳（执行会话正持有服务端游标，不能中途提交）。
+    心跳由后台定时线程写入，与处理函数是否上报进度无关；所有写入都带 claim_token 条件，
+    任务被重新排队并由其他执行者认领后，本次执行的写入不再生效。
+    """
+
+    def __init__(self, job_id: UUID, token: UUID):
+        self.job_id = job_id
+        self.token = token
+        self.done = 0
+        self.total: int | None = None
+        self._last = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat_loop, name=f"export-job-heartbeat-{job_id}", daemon=True)
+
+    def __enter__(self) -> "_JobLease":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _write(self, **values) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(
+                update(ExportJob)
+                .where(
+                    ExportJob.id == self.job_id,
+                    ExportJob.status == ExportJobStatus.running,
+                    ExportJob.claim_token == self.token,
+                )
+                .values(heartbeat_at=datetime.utcnow(), **values)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(settings.job_heartbeat_seconds):
+            try:
+                self._write()
+            except Exception:
+                logger.exception("导出任务心跳写入失败: %s", self.job_id)
+
+    def __call__(self, done: int, total: int | None) -> None:
+        self.done = done
+        if total is not None:
+            self.total = total
+        now = time.monotonic()
+        if now - self._last < 1:
+            return
+        self._last = now
+        values = {"progress": done}
+        if total is not None:
+            values["total"] = total
+        self._write(**values)
+
+
+class JobRunner:
+    """
+    本地线程池执行任务。任务状态保存在数据库中：
+    - 执行前用条件 UPDATE 认领（status=queued → running）并生成 claim_token，多个进程同时调度也只会执行一次；
+    - 执行期间后台定时写心跳；进程退出后，心跳超过 job_stale_seconds 的 running 任务会被重新排队，
+      已认领 job_max_attempts 次仍未完成的（如每次都使执行进程崩溃）标记为失败；
+    - 结果文件保留 job_artifact_retention_hours 小时，调度线程定期清理过期与无主的文件；
+    - 进度、心跳与最终状态只在 claim_token 仍属于本次执行时写入，结果文件名也带上 token，
+      被重新认领的旧执行不会覆盖新执行的文件与状态。
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._inflight: set[UUID] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export-job")
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="export-job-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def enqueue(self, job_id: UUID) -> None:
+        with self._lock:
+            if self._executor is None or job_id in self._inflight:
+                return
+            self._inflight.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.recover()
+            except Exception:
+                logger.exception("导出任务调度失败")
+            try:
+                self.purge_artifacts()
+            except Exception:
+                logger.exception("导出结果文件清理失败")
+            self._stop.wait(settings.job_poll_seconds)
+
+    def recover(self) -> None:
+        """心跳超时的 running 任务：次数用尽的标记失败，其余重新排队；然后调度所有排队中的任务。"""
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            stale = [
+                ExportJob.status == ExportJobStatus.running,
+                ExportJob.heartbeat_at < now - timedelta(seconds=settings.job_stale_seconds),
+            ]
+            exhausted = db.execute(
+                update(ExportJob)
+                .where(*stale, ExportJob.attempts >= settings.job_max_attempts)
+                .values(
+                    status=ExportJobStatus.failed,
+                    finished_at=now,
+                    error=f"已执行 {settings.job_max_attempts} 次均未完成（执行进程异常退出）",
+                )
+                .returning(ExportJob.id)
+            ).all()
+            for (job_id,) in exhausted:
+                logger.error("导出任务多次执行未完成，标记失败: %s", job_id)
+            db.execute(update(ExportJob).where(*stale).values(status=ExportJobStatus.queued))
+            db.commit()
+            queued = (
+                db.query(ExportJob.id)
+                .filter(ExportJob.status == ExportJobStatus.queued)
+                .order_by(ExportJob.created_at)
+                .limit(100)
+                .all()
+            )
+        finally:
+            db.close()
+        for (job_id,) in queued:
+            self.enqueue(job_id)
+
+    @staticmethod
+    def purge_artifacts() -> None:
+        """
+        删除过期任务的结果文件并清空其 artifact_path；再删除超过保留期且无任务引用的文件
+        （被重新认领的旧执行遗留的 .part、任务随用户删除后的结果等）。
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=settings.job_artifact_retention_hours)
+        root = _artifact_dir()
+        db = SessionLocal()
+        try:
+            expired = db.execute(
+                update(ExportJob)
+                .where(ExportJob.artifact_path.isnot(None), ExportJob.finished_at < cutoff)
+                .values(artifact_path=None)
+                .returning(ExportJob.id)
+            ).all()
+            db.commit()
+            old_files = [p for p in root.iterdir() if p.is_file() and p.stat().st_mtime < cutoff.timestamp()]
+            referenced = {
+                path
+                for (path,) in db.query(ExportJob.artifact_path).filter(
+                    ExportJob.artifact_path.in_([p.name for p in old_files])
+                )
+            } if old_files else set()
+        finally:
+            db.close()
+        for path in old_files:
+            if path.name not in referenced:
+                path.unlink(missing_ok=True)
+        if expired or old_files:
+            logger.info("已清理导出结果：过期任务 %d 个，文件 %d 个", len(expired), len(old_files) - len(referenced))
+
+    def _claim(self, db: Session, job_id: UUID) -> UUID | None:
+        """认领成功返回本次的 claim_token。"""
+        now = datetime.utcnow()
+        token = uuid4()
+        claimed = db.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id, ExportJob.status == ExportJobStatus.queued)
+            .values(
+                status=ExportJobStatus.running, started_at=now, heartbeat_at=now, progress=0, error=None,
+                claim_token=token, attempts=ExportJob.attempts + 1,
+            )
+            .returning(ExportJob.id)
+        ).first()
+        db.commit()
+        return token if claimed is not None else None
+
+    def _run(self, job_id: UUID) -> None:
+        db = SessionLocal()
+        try:
+            token = self._claim(db, job_id)
+            if token is None:
+                return
+            tmp = None
+            with _JobLease(job_id, token) as lease:
+                # 认领之后的一切（含参数校验）失败都记为任务失败，避免任务停在 running 等待重新排队
+                try:
+                    job = db.get(ExportJob, job_id)
+                    handler, ext = _HANDLERS[job.kind]
+                    user = db.get(User, job.created_by)
+                    params = ExportJobParams.model_validate(job.params)
+                    artifact = f"{job.id}.{token}.{ext}"
+                    dest = _artifact_dir() / artifact
+                    tmp = dest.with_name(dest.name + ".part")
+                    name = handler(db, user, params, tmp, lease)
+                    tmp.replace(dest)
+                except Exception as e:
+                    db.rollback()
+                    if tmp is not None:
+                        tmp.unlink(missing_ok=True)
+                    logger.exception("导出任务失败: %s", job_id)
+                    self._finish(job_id, token, ExportJobStatus.failed, error=str(e) or e.__class__.__name__)
+                    return
+            db.rollback()  # 结束只读事务，释放服务端游标
+            finished = self._finish(
+                job_id,
+                token,
+                ExportJobStatus.succeeded,
+                artifact_path=artifact,
+                artifact_name=name,
+                progress=lease.done,
+                total=lease.total if lease.total is not None else lease.done,
+            )
+            if finished:
+                logger.info("导出任务完成: %s", job_id)
+            else:
+                dest.unlink(missing_ok=True)
+        finally:
+            db.close()
+            with self._lock:
+                self._inflight.discard(job_id)
+
+    @staticmethod
+    def _finish(job_id: UUID, token: UUID, job_status: ExportJobStatus, **values) -> bool:
+        """仅当任务仍由本次认领持有时写入最终状态；已被重新认领时返回 False。"""
+        db = SessionLocal()
+        try:
+            finished = db.execute(
+                update(ExportJob)
+                .where(
+                    ExportJob.id == job_id,
+                    ExportJob.status == ExportJobStatus.running,
+                    ExportJob.claim_token == token,
+                )
+                .values(status=job_status, finished_at=datetime.utcnow(), **values)
+                .returning(ExportJob.id)
+            ).first()
+            db.commit()
+        finally:
+            db.close()
+        if finished is None:
+            logger.warning("导出任务已被重新认领，丢弃本次结果: %s", job_id)
+        return finished is not None
+
+
+job_runner = JobRunner(settings.job_workers)
+
+
+class JobService:
+    @staticmethod
+    def submit(db: Session, user: User, data: ExportJobCreate) -> ExportJob:
+        if data.kind == ExportJobKind.operation_logs_csv and user.role != UserRole.super_admin:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅超级管理员可导出操作日志")
+        job = ExportJob(
+            kind=data.kind,
+            status=ExportJobStatus.queued,
+            params=data.params.model_dump(mode="json", exclude_none=True),
+            created_by=user.id,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        job_runner.enqueue(job.id)
+        return job
+
+    @staticmethod
+    def get_job(db: Session, job_id: UUID, user: User) -> ExportJob:
+        job = db.get(ExportJob, job_id)
+        if not job:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="任务不存在")
+        if str(job.created_by) != str(user.id) and user.role != UserRole.super_admin:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权限查看该任务")
+        return job
+
+    @staticmethod
+    def list_jobs(db: Session, user: User, limit: int = 50) -> list[ExportJob]:
+        return (
+            db.query(ExportJob)
+            .filter(ExportJob.created_by == user.id)
+            .order_by(ExportJob.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+
+    @staticmethod
+    def artifact_path(job: ExportJob) -> Path:
+        if job.status != ExportJobStatus.succeeded:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="任务尚未完成")
+        if not job.artifact_path:
+            raise HTTPException(status_code=status.HTTP_410_GONE, detail="导出文件已过期清理，请重新导出")
+        return Path(settings.job_artifact_dir) / job.artifact_path
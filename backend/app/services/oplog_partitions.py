@@ -0,0 +1,131 @@
+"""操作日志分区维护：预建未来月份分区；超过保留期的分区分离、导出为 gzip CSV 后删除。"""
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT = "contract_operation_logs"
+DEFAULT_PARTITION = f"{PARENT}_default"
+_PARTITION_RE = re.compile(rf"^{PARENT}_p(\d{{4}})(\d{{2}})$")
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month:%Y%m}"
+
+
+def _partition_month(name: str) -> date | None:
+    m = _PARTITION_RE.match(name)
+    return date(int(m.group(1)), int(m.group(2)), 1) if m else None
+
+
+def list_partitions(conn: Connection) -> dict[str, bool]:
+    """按月命名的日志表 -> 是否仍挂在父表上（分离后尚未归档的表为 False）。"""
+    rows = conn.execute(
+        text(
+            "SELECT relname, relispartition FROM pg_class "
+            "WHERE relkind = 'r' AND relnamespace = current_schema()::regnamespace AND relname LIKE :prefix"
+        ),
+        {"prefix": f"{PARENT}\\_p%"},
+    )
+    return {name: attached for name, attached in rows if _PARTITION_RE.match(name)}
+
+
+def ensure_partitions(conn: Connection, months_ahead: int | None = None, since: date | None = None) -> list[str]:
+    """
+    建出从 since 所在月（默认当月）到未来 months_ahead 个月的分区，返回新建的分区名。
+    兜底分区中已有的对应月份数据会在同一事务内迁入新分区后再挂载。
+    """
+    months_ahead = settings.oplog_partitions_ahead if months_ahead is None else months_ahead
+    existing = list_partitions(conn)
+    conn.rollback()
+    this_month = month_start(datetime.utcnow().date())
+    first = min(month_start(since), this_month) if since else this_month
+    last = add_months(this_month, months_ahead)
+    created = []
+    start = first
+    while start <= last:
+        end = add_months(start, 1)
+        name = partition_name(start)
+        if name in existing:
+            start = end
+            continue
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+        conn.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :start AND created_at < :end "
+                f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"start": start, "end": end},
+        )
+        # 挂载时自动创建父表上定义的主键、索引与外键
+        conn.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')"))
+        conn.commit()
+        created.append(name)
+        logger.info("已创建操作日志分区 %s", name)
+        start = end
+    return created
+
+
+def _export_gzip(conn: Connection, table: str, dest: Path) -> None:
+    tmp = dest.with_name(dest.name + ".part")
+    cursor = conn.connection.cursor()
+    try:
+        with gzip.open(tmp, "wb") as f:
+            cursor.copy_expert(f"COPY {table} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+        conn.rollback()
+        with open(tmp, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    finally:
+        cursor.close()
+
+
+def archive_partitions(
+    conn: Connection, retention_months: int | None = None, archive_dir: str | None = None
+) -> list[Path]:
+    """
+    将整月早于保留期的分区分离、导出到 archive_dir/<分区名>.csv.gz 并删除，返回归档文件。
+    每一步单独提交：导出失败时表已分离但保留，下次运行会继续处理。
+    """
+    retention_months = settings.oplog_retention_months if retention_months is None else retention_months
+    archive_path = Path(archive_dir or settings.oplog_archive_dir)
+    archive_path.mkdir(parents=True, exist_ok=True)
+    cutoff = add_months(month_start(datetime.utcnow().date()), -retention_months)
+    archived = []
+    partitions = list_partitions(conn)
+    conn.rollback()
+    for name, attached in sorted(partitions.items()):
+        month = _partition_month(name)
+        if add_months(month, 1) > cutoff:
+            continue
+        if attached:
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+            conn.commit()
+        dest = archive_path / f"{name}.csv.gz"
+        _export_gzip(conn, name, dest)
+        conn.execute(text(f"DROP TABLE {name}"))
+        conn.commit()
+        archived.append(dest)
+        logger.info("已归档操作日志分区 %s -> %s", name, dest)
+    return archived
@@ -0,0 +1,117 @@
+"""密码哈希：bcrypt 在独立的有界线程池中计算，排队已满时直接拒绝，避免登录高峰占满请求线程池。"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """
+    bcrypt 计算时释放 GIL，线程池即可并行。同时执行与排队的任务总数不超过 workers + queue_limit，
+    超出时抛 503（带 Retry-After），调用方无需等待。
+    同步接口 hash/verify 供 def 路由使用，异步接口 hash_async/verify_async 供 async 路由使用。
+    """
+
+    def __init__(self, workers: int, queue_limit: int, rounds: int):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_limit = queue_limit
+        self.rounds = rounds
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = threading.BoundedSemaphore(self.workers + queue_limit)
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "running": 0,
+            "wait_seconds": 0.0,
+            "run_seconds": 0.0,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _record(self, **deltas) -> None:
+        with self._lock:
+            for k, v in deltas.items():
+                self._stats[k] += v
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self._record(rejected=1)
+            logger.warning("密码校验排队已满，拒绝请求")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="请求过多，请稍后重试",
+                headers={"Retry-After": "1"},
+            )
+        submitted = time.monotonic()
+
+        def run():
+            started = time.monotonic()
+            self._record(running=1, wait_seconds=started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                self._record(running=-1, completed=1, run_seconds=time.monotonic() - started)
+
+        try:
+            future = self._get_executor().submit(run)
+        except BaseException:
+            self._slots.release()
+            raise
+        self._record(submitted=1)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+    @staticmethod
+    def _verify(plain: str, hashed: str) -> bool:
+        return bcrypt.checkpw(plain.encode("utf-8"), hashed.encode("utf-8"))
+
+    def hash(self, password: str) -> str:
+        return self._submit(self._hash, password).result()
+
+    def verify(self, plain: str, hashed: str) -> bool:
+        return self._submit(self._verify, plain, hashed).result()
+
+    async def hash_async(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(self._hash, password))
+
+    async def verify_async(self, plain: str, hashed: str) -> bool:
+        return await asyncio.wrap_future(self._submit(self._verify, plain, hashed))
+
+    def stats(self) -> dict:
+        """累计计数与当前排队数，供监控使用。"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = max(stats["submitted"] - stats["completed"] - stats["running"], 0)
+        stats["workers"] = self.workers
+        stats["queue_limit"] = self.queue_limit
+        return stats
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher(settings.bcrypt_workers, settings.bcrypt_queue_limit, settings.bcrypt_rounds)
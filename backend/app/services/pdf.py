@@ -1,5 +1,6 @@
 """合同导出 PDF。"""
 import re
+from functools import lru_cache
 from io import BytesIO
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -84,35 +85,99 @@ def _format_date(v) -> str:
     return str(v)
 
 
-def build_contract_pdf(contract) -> bytes:
+# 中文字体候选（按优先级）：Docker 镜像中的文泉驿字体，其次为 macOS 本地开发环境字体
+_FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+    "/System/Library/Fonts/STHeiti Medium.ttc",
+    "/System/Library/Fonts/PingFang.ttc",
+]
+
+_STATUS_TEXT = {
+    "draft": "草稿",
+    "pending_finance": "待财务审批",
+    "finance_approved": "待管理员审批",
+    "active": "已生效",
+    "rejected": "已驳回",
+    "expired": "已到期",
+    "terminated": "已终止",
+}
+
+
+@lru_cache(maxsize=1)
+def _chinese_font() -> str:
+    """注册中文字体（每个进程只解析一次 .ttc），返回字体名。"""
+    for path in _FONT_CANDIDATES:
+        try:
+            pdfmetrics.registerFont(TTFont("SimSun", path, subfontIndex=0))
+            return "SimSun"
+        except Exception:
+            continue
+    # 如果都找不到，使用 Helvetica（会乱码，但不会报错）
+    return "Helvetica"
+
+
+@lru_cache(maxsize=1)
+def _styles() -> tuple[ParagraphStyle, TableStyle]:
+    """标题样式与表格样式，每个进程构建一次。"""
+    chinese_font = _chinese_font()
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        "ContractTitle",
+        parent=styles["Heading1"],
+        fontSize=16,
+        spaceAfter=12,
+        fontName=chinese_font,
+    )
+    table_style = TableStyle(
+        [
+            ("FONTNAME", (0, 0), (-1, -1), chinese_font),
+            ("FONTSIZE", (0, 0), (-1, -1), 10),
+            ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#f5f5f5")),
+            ("TEXTCOLOR", (0, 0), (0, -1), colors.HexColor("#333333")),
+            ("ALIGN", (0, 0), (0, -1), "RIGHT"),
+            ("ALIGN", (1, 0), (1, -1), "LEFT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("LEFTPADDING", (0, 0), (-1, -1), 8),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 8),
+            ("TOPPADDING", (0, 0), (-1, -1), 6),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ]
+    )
+    return title_style, table_style
+
+
+def warm_up() -> None:
+    """预加载字体与样式（渲染进程启动时调用）。"""
+    _styles()
+
+
+def contract_snapshot(contract) -> dict:
     """
-    根据合同对象生成 PDF 字节流。
+    提取渲染所需字段为可序列化的 dict，便于交给渲染进程。
     contract 需包含: title, contract_no, party_a, party_b, amount, sign_date,
     expire_date, status, note, creator (relationship with username)。
     """
-    # 注册中文字体
-    try:
-        # 尝试使用 Docker 容器中的中文字体 - 指定子字体索引
-        pdfmetrics.registerFont(TTFont('SimSun', '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc', subfontIndex=0))
-        chinese_font = 'SimSun'
-    except:
-        try:
-            # 备选字体路径
-            pdfmetrics.registerFont(TTFont('SimSun', '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc', subfontIndex=0))
-            chinese_font = 'SimSun'
-        except:
-            try:
-                # macOS 本地开发环境
-                pdfmetrics.registerFont(TTFont('SimSun', '/System/Library/Fonts/STHeiti Medium.ttc', subfontIndex=0))
-                chinese_font = 'SimSun'
-            except:
-                try:
-                    # macOS 备选字体
-                    pdfmetrics.registerFont(TTFont('SimSun', '/System/Library/Fonts/PingFang.ttc', subfontIndex=0))
-                    chinese_font = 'SimSun'
-                except:
-                    # 如果都找不到，使用 Helvetica（会乱码，但不会报错）
-                    chinese_font = 'Helvetica'
+    status = getattr(contract, "status", None)
+    creator = getattr(contract, "creator", None)
+    return {
+        "title": getattr(contract, "title", ""),
+        "contract_no": getattr(contract, "contract_no", ""),
+        "party_a": getattr(contract, "party_a", ""),
+        "party_b": getattr(contract, "party_b", ""),
+        "amount": getattr(contract, "amount", None),
+        "sign_date": getattr(contract, "sign_date", None),
+        "expire_date": getattr(contract, "expire_date", None),
+        "status": getattr(status, "value", status) or "",
+        "note": getattr(contract, "note", ""),
+        "creator_name": (getattr(creator, "username", "") or "") if creator else "",
+    }
+
+
+def render_contract_pdf(snapshot: dict) -> bytes:
+    """根据 contract_snapshot 生成 PDF 字节流。"""
+    title_style, table_style = _styles()
 
     buffer = BytesIO()
     doc = SimpleDocTemplate(
@@ -122,76 +187,39 @@ def build_contract_pdf(contract) -> bytes:
         leftMargin=2 * cm,
         topMargin=2 * cm,
         bottomMargin=2 * cm,
-    )
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "ContractTitle",
-        parent=styles["Heading1"],
-        fontSize=16,
-        spaceAfter=12,
-        fontName=chinese_font,
-    )
-    label_style = ParagraphStyle(
-        "Label",
-        parent=styles["Normal"],
-        fontSize=10,
-        textColor=colors.grey,
-        fontName=chinese_font,
+        invariant=1,  # 不写入创建时间与随机文档 ID，相同内容输出逐字节一致（缓存与 ETag 依赖此特性）
     )
 
-    status_map = {
-        "draft": "草稿",
-        "pending_finance": "待财务审批",
-        "finance_approved": "待管理员审批",
-        "active": "已生效",
-        "rejected": "已驳回",
-        "expired": "已到期",
-        "terminated": "已终止",
-    }
-    status_text = status_map.get(getattr(contract, "status", None) or "", str(getattr(contract, "status", "")))
-    amount_val = getattr(contract, "amount", None)
+    status = snapshot["status"]
+    status_text = _STATUS_TEXT.get(status, str(status))
+    amount_val = snapshot["amount"]
     amount_num = float(amount_val) if amount_val is not None else 0
     amount_display = f"¥ {amount_num:,.2f}" if amount_val is not None else "-"
     amount_cn = _to_chinese_amount(amount_val)
-    creator_name = ""
-    if hasattr(contract, "creator") and contract.creator:
-        creator_name = getattr(contract.creator, "username", "") or ""
 
     elements = []
-    elements.append(Paragraph(_safe_str(getattr(contract, "title", "")), title_style))
+    elements.append(Paragraph(_safe_str(snapshot["title"]), title_style))
     elements.append(Spacer(1, 0.5 * cm))
 
     data = [
-        ["合同编号", _safe_str(getattr(contract, "contract_no", ""))],
-        ["甲方", _safe_str(getattr(contract, "party_a", ""))],
-        ["乙方", _safe_str(getattr(contract, "party_b", ""))],
+        ["合同编号", _safe_str(snapshot["contract_no"])],
+        ["甲方", _safe_str(snapshot["party_a"])],
+        ["乙方", _safe_str(snapshot["party_b"])],
         ["金额", amount_display + (" （" + amount_cn + "）" if amount_cn else "")],
-        ["签订日期", _format_date(getattr(contract, "sign_date", None))],
-        ["到期日", _format_date(getattr(contract, "expire_date", None))],
+        ["签订日期", _format_date(snapshot["sign_date"])],
+        ["到期日", _format_date(snapshot["expire_date"])],
         ["状态", status_text],
-        ["创建人", creator_name or "-"],
-        ["备注", _safe_str(getattr(contract, "note", ""))],
+        ["创建人", snapshot["creator_name"] or "-"],
+        ["备注", _safe_str(snapshot["note"])],
     ]
     table = Table(data, colWidths=[4 * cm, 12 * cm])
-    table.setStyle(
-        TableStyle(
-            [
-                ("FONTNAME", (0, 0), (-1, -1), chinese_font),
-                ("FONTSIZE", (0, 0), (-1, -1), 10),
-                ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#f5f5f5")),
-                ("TEXTCOLOR", (0, 0), (0, -1), colors.HexColor("#333333")),
-                ("ALIGN", (0, 0), (0, -1), "RIGHT"),
-                ("ALIGN", (1, 0), (1, -1), "LEFT"),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("LEFTPADDING", (0, 0), (-1, -1), 8),
-                ("RIGHTPADDING", (0, 0), (-1, -1), 8),
-                ("TOPPADDING", (0, 0), (-1, -1), 6),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-            ]
-        )
-    )
+    table.setStyle(table_style)
     elements.append(table)
     doc.build(elements)
     buffer.seek(0)
     return buffer.getvalue()
+
+
+def build_contract_pdf(contract) -> bytes:
+    """在当前进程内同步生成 PDF；请求路径请用 pdf_engine（进程池）。"""
+    return render_contract_pdf(contract_snapshot(contract))
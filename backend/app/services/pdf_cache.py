@@ -0,0 +1,171 @@
+"""合同 PDF 缓存：内存 LRU + 磁盘两级，按 (合同 id, updated_at) 寻址。"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+from uuid import UUID
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# PDF 版式变更时递增，使旧缓存与旧 ETag 自动失效
+PDF_LAYOUT_VERSION = 1
+
+
+def pdf_cache_key(contract) -> str:
+    return f"{contract.id.hex}_{contract.updated_at:%Y%m%d%H%M%S%f}_v{PDF_LAYOUT_VERSION}"
+
+
+def pdf_etag(contract) -> str:
+    """强 ETag：PDF 以 invariant 模式渲染，同一 key 的输出逐字节一致。"""
+    return f'"{pdf_cache_key(contract)}"'
+
+
+class _MemoryTier:
+    """按总字节数限制容量的 LRU。"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            data = self._data.get(key)
+            if data is not None:
+                self._data.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._data[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                self._bytes -= len(self._data.pop(key))
+
+
+class _DiskTier:
+    """磁盘缓存，总大小超限时按最近访问时间（mtime）淘汰最旧的文件。"""
+
+    def __init__(self, base_dir: str, max_bytes: int):
+        self.base_dir = Path(base_dir)
+        self.max_bytes = max_bytes
+        self._bytes: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.base_dir / f"{key}.pdf"
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # 记录访问时间，供 LRU 淘汰
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        self.base_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan_size()
+            else:
+                self._bytes += len(data)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        if not self.base_dir.exists():
+            return
+        for path in self.base_dir.glob(f"{prefix}*.pdf"):
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._bytes = None
+
+    def _scan_size(self) -> int:
+        return sum(p.stat().st_size for p in self.base_dir.glob("*.pdf"))
+
+    def _evict(self) -> None:
+        # 多进程共享同一目录，淘汰前重新统计实际占用
+        entries = []
+        for p in self.base_dir.glob("*.pdf"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        # 淘汰到上限的 90%，避免每次写入都触发扫描
+        target = self.max_bytes * 0.9
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= target:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+        self._bytes = total
+
+
+class PdfCache:
+    def __init__(self):
+        self.memory = _MemoryTier(settings.pdf_cache_memory_bytes)
+        self.disk = _DiskTier(settings.pdf_cache_dir, settings.pdf_cache_disk_bytes)
+
+    def get(self, contract) -> bytes | None:
+        key = pdf_cache_key(contract)
+        data = self.memory.get(key)
+        if data is not None:
+            return data
+        data = self.disk.get(key)
+        if data is not None:
+            self.memory.put(key, data)
+        return data
+
+    def put(self, contract, data: bytes) -> None:
+        key = pdf_cache_key(contract)
+        self.memory.put(key, data)
+        try:
+            self.disk.put(key, data)
+        except OSError:
+            logger.warning("PDF 磁盘缓存写入失败: %s", key, exc_info=True)
+
+    def get_or_render(self, contract, render: Callable[[object], bytes]) -> bytes:
+        data = self.get(contract)
+        if data is None:
+            data = render(contract)
+            self.put(contract, data)
+        return data
+
+    def invalidate(self, contract_id: UUID) -> None:
+        """合同编辑、状态变更或删除后清除其所有版本的缓存。"""
+        prefix = f"{contract_id.hex}_"
+        self.memory.invalidate_prefix(prefix)
+        try:
+            self.disk.invalidate_prefix(prefix)
+        except OSError:
+            logger.warning("PDF 磁盘缓存清理失败: %s", contract_id, exc_info=True)
+
+
+pdf_cache = PdfCache()
@@ -0,0 +1,154 @@
+"""PDF 渲染引擎：在独立进程池中渲染，避免 reportlab 占用 GIL 拖慢其他请求。"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+from app.services.pdf import contract_snapshot, render_contract_pdf, warm_up
+
+logger = logging.getLogger(__name__)
+
+
+class PdfEngine:
+    """
+    进程池懒加载；每个渲染进程启动时预加载字体与样式，之后只做排版。
+    同步接口 render 供 def 路由使用（等待期间释放 GIL），异步接口 render_async 供 async 路由使用。
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        # 各进程池的在途任务及其截止时间，回收旧池时据此判断哪些进程卡死
+        self._inflight: dict[ProcessPoolExecutor, dict[Future, float]] = {}
+        self._inflight_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # spawn：不继承父进程的数据库连接与线程
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=warm_up,
+                    )
+                    logger.info("PDF 渲染进程池已启动，进程数 %d", self.workers)
+        return self._pool
+
+    def submit(self, contract) -> Future:
+        """提交渲染任务。contract 在当前线程内转为快照，须在会话有效期内调用。"""
+        return self.submit_snapshot(contract_snapshot(contract))
+
+    def submit_snapshot(self, snapshot: dict) -> Future:
+        pool = self._get_pool()
+        try:
+            return self._submit_to(pool, snapshot)
+        except RuntimeError:
+            # BrokenProcessPool：渲染进程异常退出后进程池不可再用；或该池刚被其他线程回收。换新池重试一次
+            logger.warning("PDF 渲染进程池已损坏，重建后重试")
+            self._replace(pool)
+            return self._submit_to(self._get_pool(), snapshot)
+
+    def _submit_to(self, pool: ProcessPoolExecutor, snapshot: dict) -> Future:
+        future = pool.submit(render_contract_pdf, snapshot)
+        deadline = time.monotonic() + settings.pdf_render_timeout_seconds
+        with self._inflight_lock:
+            self._inflight.setdefault(pool, {})[future] = deadline
+        # 须在登记之后注册：已完成的 future 会立即回调
+        future.add_done_callback(lambda f: self._forget(pool, f))
+        return future
+
+    def _forget(self, pool: ProcessPoolExecutor, future: Future) -> None:
+        with self._inflight_lock:
+            futures = self._inflight.get(pool)
+            if futures is not None:
+                futures.pop(future, None)
+
+    def render(self, contract) -> bytes:
+        future = self.submit(contract)
+        try:
+            return future.result(timeout=settings.pdf_render_timeout_seconds)
+        except FutureTimeoutError:
+            self.recycle()
+            raise _unavailable("PDF 生成超时，请稍后重试")
+        except BrokenProcessPool:
+            raise _unavailable("PDF 渲染进程异常退出，请稍后重试")
+
+    async def render_async(self, contract) -> bytes:
+        future = asyncio.wrap_future(self.submit(contract))
+        try:
+            return await asyncio.wait_for(future, timeout=settings.pdf_render_timeout_seconds)
+        except asyncio.TimeoutError:
+            self.recycle()
+            raise _unavailable("PDF 生成超时，请稍后重试")
+        except BrokenProcessPool:
+            raise _unavailable("PDF 渲染进程异常退出，请稍后重试")
+
+    def recycle(self) -> None:
+        """
+        渲染超时后调用：新任务改投新池；旧池中其他在途任务照常完成（各自到截止时间为止），
+        之后仍存活的进程只可能卡在已超时的任务上，予以终止，避免挂起的进程越积越多。
+        """
+        pool = self._pool
+        if pool is not None:
+            logger.warning("PDF 渲染超时，回收进程池")
+            self._replace(pool)
+
+    def _replace(self, pool: ProcessPoolExecutor) -> None:
+        """若 pool 仍是当前池则换下；多个线程同时发现同一个坏池时只重建一次。"""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        with self._inflight_lock:
+            inflight = self._inflight.pop(pool, {})
+        # shutdown 会清空 _processes（ProcessPoolExecutor 无公开的终止接口），须先取出子进程
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        pool.shutdown(wait=False)
+        threading.Thread(target=_reap, args=(processes, inflight), name="pdf-pool-reaper", daemon=True).start()
+
+    def start(self) -> None:
+        """预热：启动进程池并让每个进程加载字体。"""
+        pool = self._get_pool()
+        for f in [pool.submit(warm_up) for _ in range(self.workers)]:
+            f.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+        with self._inflight_lock:
+            self._inflight.clear()
+
+
+def _unavailable(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=detail,
+        headers={"Retry-After": "5"},
+    )
+
+
+def _reap(processes: list, inflight: dict[Future, float]) -> None:
+    """等旧池的在途任务完成或到各自截止时间，再终止仍存活的进程（空闲进程在 shutdown 后已自行退出）。"""
+    for future, deadline in inflight.items():
+        try:
+            future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            pass
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+pdf_engine = PdfEngine(settings.pdf_workers)
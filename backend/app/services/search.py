@@ -0,0 +1,35 @@
+"""合同关键词检索：基于 search_vector（中文二元分词 tsvector + GIN 索引）。"""
+import re
+
+from sqlalchemy import cast, func, or_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from app.models.contract import Contract
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(keyword: str) -> str:
+    # 与数据库函数 contract_search_bigrams 保持一致：去空白、转小写
+    return _WHITESPACE.sub("", keyword).lower()
+
+
+def keyword_filter(keyword: str):
+    """
+    返回 (过滤条件, 相关度表达式)。
+    关键词按二元切分后以短语查询匹配 search_vector，等价于子串匹配且可走 GIN 索引；
+    单个字符无法切出二元组，退回 ilike（此时相关度为 None）。
+    """
+    if len(_normalize(keyword)) < 2:
+        pattern = f"%{keyword.strip()}%"
+        clause = or_(
+            Contract.title.ilike(pattern),
+            Contract.contract_no.ilike(pattern),
+            Contract.party_a.ilike(pattern),
+            Contract.party_b.ilike(pattern),
+        )
+        return clause, None
+    tsquery = func.phraseto_tsquery(cast("simple", REGCONFIG), func.contract_search_bigrams(keyword))
+    clause = Contract.search_vector.op("@@")(tsquery)
+    rank = func.ts_rank(Contract.search_vector, tsquery)
+    return clause, rank
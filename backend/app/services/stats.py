@@ -0,0 +1,119 @@
+"""合同统计：读取物化视图 contract_stats（见迁移 008），后台线程在合同表有写入时并发刷新。"""
+import logging
+import threading
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import BigInteger, Column, MetaData, Numeric, String, Table, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import engine
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# 物化视图不由 ORM 建表，单独的 MetaData 避免 Base.metadata / autogenerate 把它当普通表
+contract_stats = Table(
+    "contract_stats",
+    MetaData(),
+    Column("dimension", String, primary_key=True),
+    Column("bucket", String, primary_key=True),
+    Column("contract_count", BigInteger),
+    Column("total_amount", Numeric(18, 2)),
+)
+
+DIMENSIONS = ("status", "month", "creator", "party_a", "party_b")
+# 这些维度按自身排序返回全部分组，其余按金额取前 N
+_ORDERED_DIMENSIONS = ("status", "month")
+
+# pg_try_advisory_lock 的 key（任意固定值），多进程中同一时间只有一个刷新
+_REFRESH_LOCK_KEY = 8_001_001
+
+
+class StatsService:
+    @staticmethod
+    async def contract_stats(db: AsyncSession, user: User, dimension: str, limit: int = 50) -> list[dict]:
+        if user.role not in (UserRole.finance, UserRole.super_admin):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="仅财务与超级管理员可查看统计")
+        q = select(contract_stats).where(contract_stats.c.dimension == dimension)
+        if dimension in _ORDERED_DIMENSIONS:
+            q = q.order_by(contract_stats.c.bucket)
+        else:
+            q = q.order_by(contract_stats.c.total_amount.desc(), contract_stats.c.bucket).limit(limit)
+        rows = (await db.execute(q)).all()
+        labels = {}
+        if dimension == "creator" and rows:
+            ids = [UUID(r.bucket) for r in rows]
+            labels = {
+                str(uid): name
+                for uid, name in (await db.execute(select(User.id, User.username).where(User.id.in_(ids)))).all()
+            }
+        return [
+            {
+                "bucket": r.bucket,
+                "label": labels.get(r.bucket, r.bucket),
+                "count": r.contract_count,
+                "amount": r.total_amount,
+            }
+            for r in rows
+        ]
+
+
+class StatsRefresher:
+    """
+    每 stats_refresh_seconds 检查一次 contracts 表的累计增删改行数（pg_stat_user_tables），
+    有变化时 REFRESH MATERIALIZED VIEW CONCURRENTLY；刷新期间统计查询不受阻塞。
+    以表级计数判断而非应用内标记，导入脚本等其他进程的写入也能触发刷新，且不给写路径增加任何开销。
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_signature: int | None = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="contract-stats-refresher", daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(settings.stats_refresh_seconds):
+            try:
+                self.refresh_if_changed()
+            except Exception:
+                logger.exception("合同统计刷新失败")
+
+    def refresh_if_changed(self) -> bool:
+        # 会话级 advisory lock 绑定在连接上，加锁到解锁须始终使用同一连接
+        with engine.connect() as conn:
+            signature = conn.execute(
+                text(
+                    "SELECT n_tup_ins + n_tup_upd + n_tup_del FROM pg_stat_user_tables "
+                    "WHERE relname = 'contracts' AND schemaname = current_schema()"
+                )
+            ).scalar()
+            conn.rollback()
+            if signature is None or signature == self._last_signature:
+                return False
+            if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _REFRESH_LOCK_KEY}).scalar():
+                # 其他进程正在刷新，本轮视为已覆盖
+                conn.rollback()
+                self._last_signature = signature
+                return False
+            try:
+                conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY contract_stats"))
+                conn.commit()
+            finally:
+                conn.rollback()
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _REFRESH_LOCK_KEY})
+                conn.commit()
+        self._last_signature = signature
+        logger.info("合同统计已刷新")
+        return True
+
+
+stats_refresher = StatsRefresher()
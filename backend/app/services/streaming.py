@@ -0,0 +1,114 @@
+"""文件下载响应：分块流式输出，支持 Range（206）与 If-None-Match（304）。"""
+import re
+from typing import BinaryIO, Callable, Iterator
+
+from fastapi import Request, status
+from fastapi.responses import Response, StreamingResponse
+
+CHUNK_SIZE = 256 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """
+    解析单段 Range 头，返回闭区间 (start, end)；无 Range 或多段请求返回 None（按整文件响应）。
+    区间越界时抛 RangeNotSatisfiable。
+    """
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m:
+        return None
+    first, last = m.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # 后缀区间：bytes=-500 表示最后 500 字节
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def iter_file(f: BinaryIO, start: int, length: int, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """从 start 处读取 length 字节，按块产出，结束后关闭文件。"""
+    try:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match 使用弱比较，忽略 W/ 前缀
+    candidates = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return etag in candidates
+
+
+def file_response(
+    request: Request,
+    opener: Callable[[], BinaryIO],
+    size: int,
+    etag: str,
+    media_type: str = "application/octet-stream",
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """
+    构造下载响应。etag 须为带引号的强校验值（如 '"abc"'）。
+    opener 仅在确需输出内容时调用，304/416 不会打开文件。
+    """
+    base_headers = {"ETag": etag, "Accept-Ranges": "bytes", **(headers or {})}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        # 资源已变化，忽略 Range，返回完整内容
+        range_header = None
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{size}", **base_headers},
+        )
+
+    if byte_range is None:
+        return StreamingResponse(
+            iter_file(opener(), 0, size),
+            media_type=media_type,
+            headers={"Content-Length": str(size), **base_headers},
+        )
+    start, end = byte_range
+    length = end - start + 1
+    return StreamingResponse(
+        iter_file(opener(), start, length),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=media_type,
+        headers={
+            "Content-Length": str(length),
+            "Content-Range": f"bytes {start}-{end}/{size}",
+            **base_headers,
+        },
+    )
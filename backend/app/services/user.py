@@ -1,69 +1,74 @@
 """用户 CRUD，仅超级管理员可调用。"""
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserUpdate
-from app.services.auth import hash_password
+from app.services.auth import hash_password_async, invalidate_user_cache
 
 
 class UserService:
     @staticmethod
-    def list_users(db: Session) -> list[User]:
-        return db.query(User).order_by(User.created_at.desc()).all()
+    async def list_users(db: AsyncSession) -> list[User]:
+        result = await db.execute(select(User).order_by(User.created_at.desc()))
+        return list(result.scalars())
 
     @staticmethod
-    def get_user(db: Session, user_id: UUID) -> User | None:
-        return db.query(User).filter(User.id == user_id).first()
+    async def get_user(db: AsyncSession, user_id: UUID) -> User | None:
+        return await db.get(User, user_id)
 
     @staticmethod
-    def create_user(db: Session, data: UserCreate, creator_id: UUID) -> User:
-        if db.query(User).filter(User.username == data.username).first():
+    async def create_user(db: AsyncSession, data: UserCreate, creator_id: UUID) -> User:
+        exists = await db.execute(select(User.id).where(User.username == data.username))
+        if exists.first():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="用户名已存在",
             )
         user = User(
             username=data.username,
-            password_hash=hash_password(data.password),
+            password_hash=await hash_password_async(data.password),
             role=data.role,
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
 
     @staticmethod
-    def update_user(
-        db: Session, user_id: UUID, data: UserUpdate, current_user_id: UUID
+    async def update_user(
+        db: AsyncSession, user_id: UUID, data: UserUpdate, current_user_id: UUID
     ) -> User:
-        user = UserService.get_user(db, user_id)
+        user = await UserService.get_user(db, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="用户不存在",
             )
         if data.password is not None:
-            user.password_hash = hash_password(data.password)
+            user.password_hash = await hash_password_async(data.password)
         if data.role is not None:
             user.role = data.role
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
+        invalidate_user_cache(user_id)
         return user
 
     @staticmethod
-    def delete_user(db: Session, user_id: UUID, current_user_id: UUID) -> None:
+    async def delete_user(db: AsyncSession, user_id: UUID, current_user_id: UUID) -> None:
         if user_id == current_user_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="不能删除自己",
             )
-        user = UserService.get_user(db, user_id)
+        user = await UserService.get_user(db, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="用户不存在",
             )
-        db.delete(user)
-        db.commit()
+        await db.delete(user)
+        await db.commit()
+        invalidate_user_cache(user_id)
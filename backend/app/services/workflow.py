@@ -0,0 +1,95 @@
+"""合同审批流：状态迁移表与原子迁移（条件 UPDATE + 写日志，一条语句一个事务）。"""
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.models.contract import Contract, ContractStatus
+from app.models.operation_log import ContractOperationLog
+from app.models.user import User, UserRole
+
+_ALL_ROLES = frozenset(UserRole)
+_FINANCE = frozenset({UserRole.finance, UserRole.super_admin})
+_ADMIN = frozenset({UserRole.super_admin})
+
+
+@dataclass(frozen=True)
+class Transition:
+    action: str  # 同时作为操作日志的 action
+    from_status: ContractStatus
+    to_status: ContractStatus
+    roles: frozenset[UserRole]
+    forbidden_detail: str  # 角色不符或非创建人时的 403 提示
+    conflict_detail: str  # 当前状态不允许时的 409 提示
+    creator_only: bool = False
+
+
+TRANSITIONS: dict[str, Transition] = {
+    t.action: t
+    for t in (
+        Transition("submit", ContractStatus.draft, ContractStatus.pending_finance,
+                   _ALL_ROLES, "仅创建人可提交", "仅草稿可提交审批", creator_only=True),
+        Transition("withdraw_creator", ContractStatus.pending_finance, ContractStatus.draft,
+                   _ALL_ROLES, "仅创建人可撤回", "仅待财务审批状态可撤回", creator_only=True),
+        Transition("approve_finance", ContractStatus.pending_finance, ContractStatus.finance_approved,
+                   _FINANCE, "仅财务可审批", "当前状态不允许财务审批"),
+        Transition("reject_finance", ContractStatus.pending_finance, ContractStatus.rejected,
+                   _FINANCE, "仅财务可驳回", "当前状态不允许财务驳回"),
+        Transition("withdraw_finance", ContractStatus.finance_approved, ContractStatus.pending_finance,
+                   _FINANCE, "仅财务可撤回", "仅待管理员审批状态可撤回"),
+        Transition("approve_admin", ContractStatus.finance_approved, ContractStatus.active,
+                   _ADMIN, "仅超级管理员可终审", "当前状态不允许管理员审批"),
+        Transition("reject_admin", ContractStatus.finance_approved, ContractStatus.rejected,
+                   _ADMIN, "仅超级管理员可终审驳回", "当前状态不允许管理员驳回"),
+    )
+}
+
+
+def check_role(t: Transition, user: User) -> None:
+    if user.role not in t.roles:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=t.forbidden_detail)
+
+
+def apply_transition(
+    db: Session, t: Transition, contract_ids: list[UUID], user: User, remark: str | None = None
+) -> set[UUID]:
+    """
+    在一条语句内完成迁移与日志（日志为多行 INSERT ... SELECT）：
+        WITH moved AS (UPDATE contracts SET status = :to ... WHERE id IN (...) AND status = :from RETURNING id)
+        INSERT INTO contract_operation_logs ... SELECT ... FROM moved
+    返回实际迁移的合同 id；状态已被他人改变（或非创建人）的合同不会更新。调用方负责提交。
+    """
+    if not contract_ids:
+        return set()
+    guard = [Contract.id.in_(contract_ids), Contract.status == t.from_status]
+    if t.creator_only:
+        guard.append(Contract.created_by == user.id)
+    moved = (
+        update(Contract)
+        .where(*guard)
+        .values(status=t.to_status)
+        .returning(Contract.id)
+        .cte("moved")
+    )
+    log = (
+        insert(ContractOperationLog)
+        .from_select(
+            ["id", "contract_id", "user_id", "action", "from_status", "to_status", "remark", "created_at"],
+            select(
+                func.gen_random_uuid(),
+                moved.c.id,
+                literal(user.id),
+                literal(t.action),
+                literal(t.from_status.value),
+                literal(t.to_status.value),
+                literal(remark),
+                literal(datetime.utcnow()),
+            ),
+        )
+        .add_cte(moved)
+        .returning(ContractOperationLog.contract_id)
+    )
+    return {contract_id for (contract_id,) in db.execute(log)}
@@ -1,4 +1,4 @@
-from app.storage.base import Storage
+from app.storage.base import Storage, StagedFile, FileTooLarge
 from app.storage.local import LocalStorage
 
-__all__ = ["Storage", "LocalStorage"]
+__all__ = ["Storage", "StagedFile", "FileTooLarge", "LocalStorage"]
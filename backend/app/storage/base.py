@@ -1,14 +1,57 @@
 """文件存储抽象，便于后续接入 OSS。"""
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import BinaryIO
 
 
+class FileTooLarge(Exception):
+    """上传内容超过允许的最大字节数。"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"file exceeds {max_size} bytes")
+        self.max_size = max_size
+
+
+@dataclass
+class StagedFile:
+    """已写入临时位置、尚未落到最终 key 的文件。"""
+
+    token: str  # 后端相关的临时句柄（本地实现为临时文件路径）
+    size: int
+    sha256: str
+
+
 class Storage(ABC):
     @abstractmethod
     def save(self, key: str, content: BinaryIO, size: int) -> str:
         """保存文件，返回存储路径或 URL（用于数据库存 file_path）。"""
         pass
 
+    @abstractmethod
+    def stage(self, content: BinaryIO, max_size: int | None = None) -> StagedFile:
+        """分块读取 content 写入临时位置，同时计算大小与 SHA-256；超过 max_size 抛 FileTooLarge。"""
+        pass
+
+    @abstractmethod
+    def promote(self, staged: StagedFile, key: str) -> str:
+        """将暂存文件原子地移动到 key，返回 key。"""
+        pass
+
+    @abstractmethod
+    def discard(self, staged: StagedFile) -> None:
+        """丢弃暂存文件。"""
+        pass
+
+    def save_stream(self, key: str, content: BinaryIO, max_size: int | None = None) -> StagedFile:
+        """流式保存：暂存后原子落盘，返回包含大小与哈希的 StagedFile。"""
+        staged = self.stage(content, max_size)
+        try:
+            self.promote(staged, key)
+        except Exception:
+            self.discard(staged)
+            raise
+        return staged
+
     @abstractmethod
     def get_path(self, key: str) -> str:
         """返回本地路径或可下载 URL。本地实现返回绝对路径。"""
@@ -16,7 +59,22 @@ class Storage(ABC):
 
     @abstractmethod
     def read(self, key: str) -> bytes:
-        """读取文件内容（用于下载响应）。"""
+        """读取文件全部内容（小文件用；下载请用 open 流式读取）。"""
+        pass
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """以二进制只读方式打开文件，支持 seek；调用方负责关闭。不存在时抛 FileNotFoundError。"""
+        pass
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """文件是否存在。"""
+        pass
+
+    @abstractmethod
+    def size(self, key: str) -> int:
+        """文件字节数。不存在时抛 FileNotFoundError。"""
         pass
 
     @abstractmethod
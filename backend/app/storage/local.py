@@ -1,8 +1,11 @@
 """本地磁盘存储。"""
+import hashlib
+import os
+import tempfile
 from pathlib import Path
 from typing import BinaryIO
 from app.config import settings
-from app.storage.base import Storage
+from app.storage.base import Storage, StagedFile, FileTooLarge
 
 
 class LocalStorage(Storage):
@@ -20,6 +23,40 @@ class LocalStorage(Storage):
             f.write(content.read(size))
         return key
 
+    def stage(self, content: BinaryIO, max_size: int | None = None) -> StagedFile:
+        # 临时文件与目标在同一文件系统下，promote 时 os.replace 才是原子的
+        tmp_dir = self.base_dir / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                while True:
+                    chunk = content.read(settings.upload_chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise FileTooLarge(max_size)
+                    digest.update(chunk)
+                    f.write(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        return StagedFile(token=tmp_path, size=size, sha256=digest.hexdigest())
+
+    def promote(self, staged: StagedFile, key: str) -> str:
+        path = self._full_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged.token, path)
+        return key
+
+    def discard(self, staged: StagedFile) -> None:
+        Path(staged.token).unlink(missing_ok=True)
+
     def get_path(self, key: str) -> str:
         return str(self._full_path(key).resolve())
 
@@ -29,6 +66,15 @@ class LocalStorage(Storage):
             raise FileNotFoundError(key)
         return path.read_bytes()
 
+    def open(self, key: str) -> BinaryIO:
+        return open(self._full_path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return self._full_path(key).is_file()
+
+    def size(self, key: str) -> int:
+        return self._full_path(key).stat().st_size
+
     def delete(self, key: str) -> None:
         path = self._full_path(key)
         if path.exists():
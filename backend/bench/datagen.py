@@ -0,0 +1,234 @@
+"""
+压测数据生成：用户、合同、附件元数据与操作日志，经 COPY 流式写入（百万行级别不占内存）。
+合成数据以 bench_ 用户名 / BENCH- 合同编号标识，--cleanup 删除。
+
+    python bench/datagen.py --contracts 1000000 --users 2000
+    python bench/datagen.py --cleanup
+
+附件只写元数据（不落盘），下载接口不在压测范围内。
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from app.database import engine
+from app.services.auth import hash_password
+from app.services.oplog_partitions import ensure_partitions
+
+USER_PREFIX = "bench_"
+CONTRACT_PREFIX = "BENCH-"
+DEFAULT_PASSWORD = "bench123"
+
+# 最终状态分布，以及到达该状态经过的审批动作（依次写成操作日志）
+_STATUS_WEIGHTS = {
+    "active": 55, "draft": 12, "pending_finance": 8, "finance_approved": 5,
+    "rejected": 6, "expired": 10, "terminated": 4,
+}
+_STATUS_PATHS = {
+    "draft": [],
+    "pending_finance": [("submit", "draft", "pending_finance")],
+    "finance_approved": [("submit", "draft", "pending_finance"),
+                         ("approve_finance", "pending_finance", "finance_approved")],
+    "active": [("submit", "draft", "pending_finance"),
+               ("approve_finance", "pending_finance", "finance_approved"),
+               ("approve_admin", "finance_approved", "active")],
+    "rejected": [("submit", "draft", "pending_finance"), ("reject_finance", "pending_finance", "rejected")],
+}
+_STATUS_PATHS["expired"] = _STATUS_PATHS["terminated"] = _STATUS_PATHS["active"]
+
+_CONTRACT_COLUMNS = (
+    "id, title, contract_no, party_a, party_b, amount, sign_date, expire_date, status, note, "
+    "created_by, created_at, updated_at"
+)
+_ATTACHMENT_COLUMNS = "id, contract_id, file_name, file_path, file_size, created_at"
+_LOG_COLUMNS = "id, contract_id, user_id, action, from_status, to_status, remark, created_at"
+
+
+def _copy_value(v) -> str:
+    if v is None:
+        return "\\N"
+    return str(v).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+class CopyStream:
+    """把行迭代器包装成 copy_expert 读取的文件对象，按需生成，不在内存中拼出整张表。"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buf = ""
+        self.count = 0
+
+    def read(self, size: int = -1) -> str:
+        chunks = [self._buf]
+        length = len(self._buf)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = "\t".join(_copy_value(v) for v in row) + "\n"
+            chunks.append(line)
+            length += len(line)
+            self.count += 1
+        data = "".join(chunks)
+        if size < 0:
+            self._buf = ""
+            return data
+        self._buf = data[size:]
+        return data[:size]
+
+
+def _copy(conn, table: str, columns: str, rows) -> int:
+    stream = CopyStream(rows)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", stream, size=65536)
+    finally:
+        cursor.close()
+    return stream.count
+
+
+def _users(args, password_hash: str, now: datetime):
+    for role, n in (("normal", args.users), ("finance", args.finance), ("super_admin", args.admins)):
+        for i in range(1, n + 1):
+            yield uuid.uuid4(), f"{USER_PREFIX}{role}_{i}", password_hash, role, now
+
+
+class _Generator:
+    """合同与其附件、日志一次生成：合同行先 COPY，附件与日志按相同随机种子重放。"""
+
+    def __init__(self, args, creators: list, approvers: dict, now: datetime):
+        self.args = args
+        self.creators = creators
+        self.approvers = approvers
+        self.now = now
+        self.statuses = list(_STATUS_WEIGHTS)
+        self.weights = list(_STATUS_WEIGHTS.values())
+
+    def contracts(self):
+        """产出 (合同行, 最终状态, 创建人, 创建时间, 更新时间)。"""
+        rng = random.Random(self.args.seed)
+        span = self.args.days * 86400
+        for i in range(1, self.args.contracts + 1):
+            created_at = self.now - timedelta(seconds=rng.random() * span)
+            updated_at = created_at + timedelta(seconds=rng.random() * (self.now - created_at).total_seconds())
+            status = rng.choices(self.statuses, self.weights)[0]
+            creator = rng.choice(self.creators)
+            sign_date = created_at.date() + timedelta(days=rng.randint(0, 30)) if status != "draft" else None
+            expire_date = sign_date + timedelta(days=365 * rng.randint(1, 3)) if sign_date else None
+            # id 由种子决定：附件与日志重放同一序列时能对上合同
+            contract_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            row = (
+                contract_id, f"合成合同 {i}", f"{CONTRACT_PREFIX}{i:09d}",
+                f"甲方公司 {rng.randint(1, 500)}", f"乙方公司 {rng.randint(1, 2000)}",
+                f"{rng.uniform(1000, 5_000_000):.2f}", sign_date, expire_date, status, None,
+                creator, created_at, updated_at,
+            )
+            yield row, status, creator, created_at, updated_at
+
+    def contract_rows(self):
+        for row, *_ in self.contracts():
+            yield row
+
+    def attachment_rows(self):
+        rng = random.Random(self.args.seed + 1)
+        whole, frac = int(self.args.attachments), self.args.attachments % 1
+        for row, _, _, created_at, _ in self.contracts():
+            for n in range(whole + (rng.random() < frac)):
+                att_id = uuid.uuid4()
+                yield att_id, row[0], f"附件{n + 1}.pdf", f"bench/{att_id}.pdf", rng.randint(10_000, 5_000_000), created_at
+
+    def log_rows(self):
+        rng = random.Random(self.args.seed + 2)
+        for row, status, creator, created_at, updated_at in self.contracts():
+            contract_id = row[0]
+            yield uuid.uuid4(), contract_id, creator, "create", None, "draft", None, created_at
+            path = _STATUS_PATHS[status]
+            edits = int(self.args.edits) + (rng.random() < self.args.edits % 1)
+            steps = [("edit", None, None)] * edits + path
+            span = (updated_at - created_at).total_seconds()
+            for k, (action, from_status, to_status) in enumerate(steps, start=1):
+                ts = created_at + timedelta(seconds=span * k / len(steps))
+                if action in ("approve_finance", "reject_finance"):
+                    user = rng.choice(self.approvers["finance"])
+                elif action == "approve_admin":
+                    user = rng.choice(self.approvers["super_admin"])
+                else:
+                    user = creator
+                yield uuid.uuid4(), contract_id, user, action, from_status, to_status, None, ts
+
+
+def generate(args) -> None:
+    now = datetime.utcnow()
+    started = time.monotonic()
+    with engine.connect() as conn:
+        # 日志按月分区：先为整个时间跨度建好分区，避免合成日志全部落入兜底分区
+        ensure_partitions(conn, since=(now - timedelta(days=args.days)).date())
+        n = _copy(conn, "users", "id, username, password_hash, role, created_at",
+                  _users(args, hash_password(args.password), now))
+        rows = conn.execute(
+            text("SELECT id, role FROM users WHERE username LIKE :p"), {"p": USER_PREFIX + "%"}
+        ).all()
+        by_role: dict[str, list] = {"normal": [], "finance": [], "super_admin": []}
+        for user_id, role in rows:
+            by_role[role.value if hasattr(role, "value") else role].append(user_id)
+        print(f"用户 {n} 行")
+        gen = _Generator(args, by_role["normal"], by_role, now)
+        for table, columns, source in (
+            ("contracts", _CONTRACT_COLUMNS, gen.contract_rows()),
+            ("contract_attachments", _ATTACHMENT_COLUMNS, gen.attachment_rows()),
+            ("contract_operation_logs", _LOG_COLUMNS, gen.log_rows()),
+        ):
+            t0 = time.monotonic()
+            n = _copy(conn, table, columns, source)
+            elapsed = time.monotonic() - t0
+            print(f"{table} {n} 行（{elapsed:.1f}s，{n / elapsed if elapsed else 0:.0f} 行/s）")
+        conn.commit()
+        for table in ("users", "contracts", "contract_attachments", "contract_operation_logs"):
+            conn.execute(text(f"ANALYZE {table}"))
+        conn.commit()
+    print(f"完成，用时 {time.monotonic() - started:.1f}s；压测账号密码: {args.password}")
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        # 附件与日志随合同级联删除
+        n = conn.execute(text("DELETE FROM contracts WHERE contract_no LIKE :p"), {"p": CONTRACT_PREFIX + "%"}).rowcount
+        conn.execute(
+            text(
+                "DELETE FROM contract_operation_logs WHERE user_id IN "
+                "(SELECT id FROM users WHERE username LIKE :p)"
+            ),
+            {"p": USER_PREFIX + "%"},
+        )
+        m = conn.execute(text("DELETE FROM users WHERE username LIKE :p"), {"p": USER_PREFIX + "%"}).rowcount
+    print(f"已删除合同 {n} 份、用户 {m} 个")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200, help="普通用户数")
+    parser.add_argument("--finance", type=int, default=10, help="财务用户数")
+    parser.add_argument("--admins", type=int, default=3, help="超级管理员数")
+    parser.add_argument("--contracts", type=int, default=100_000)
+    parser.add_argument("--attachments", type=float, default=1.5, help="每份合同平均附件数")
+    parser.add_argument("--edits", type=float, default=1.0, help="每份合同平均编辑次数（各写一条 edit 日志）")
+    parser.add_argument("--days", type=int, default=730, help="合同创建时间分布的天数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="合成用户的登录密码")
+    parser.add_argument("--cleanup", action="store_true", help="删除合成数据后退出")
+    args = parser.parse_args()
+    if args.cleanup:
+        cleanup()
+    else:
+        generate(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+读接口压测：固定并发持续请求，输出吞吐（req/s）与延迟分位数。
+
+对比同步/异步数据库路径时，分别在两个版本上以相同并发运行，比较相近 p95 下的 req/s：
+    python bench/load.py --base-url http://localhost:8000 --concurrency 64 --duration 30 \
+        --path /api/contracts --path "/api/contracts?keyword=采购"
+"""
+import argparse
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+
+def percentile(samples: list[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[k]
+
+
+class Client:
+    """单个 keep-alive 连接；每个压测线程一个。"""
+
+    def __init__(self, base_url: str, token: str | None = None):
+        parts = urlsplit(base_url)
+        conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.conn = conn_cls(parts.netloc, timeout=30)
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+
+    def request(self, method: str, path: str, body: dict | None = None) -> tuple[int, bytes]:
+        headers = dict(self.headers)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            self.conn.request(method, quote(path, safe="/?&=%:"), body=payload, headers=headers)
+            resp = self.conn.getresponse()
+            return resp.status, resp.read()
+        except (OSError, http.client.HTTPException):
+            self.conn.close()  # 下次请求自动重连
+            raise
+
+
+def login(base_url: str, username: str, password: str) -> str:
+    status, data = Client(base_url).request("POST", "/api/auth/login", {"username": username, "password": password})
+    if status != 200:
+        raise SystemExit(f"登录失败: HTTP {status} {data[:200]!r}")
+    return json.loads(data)["access_token"]
+
+
+def run(base_url: str, token: str, paths: list[str], concurrency: int, duration: float) -> dict:
+    """各线程轮流请求 paths，直到 duration 秒结束；返回汇总结果。"""
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(offset: int):
+        nonlocal errors
+        client = Client(base_url, token)
+        local: list[float] = []
+        local_errors = 0
+        i = offset
+        while time.monotonic() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                status, _ = client.request("GET", path)
+            except (OSError, http.client.HTTPException):
+                status = 0
+            elapsed = time.perf_counter() - started
+            if 200 <= status < 400:
+                local.append(elapsed)
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    parser.add_argument("--path", action="append", dest="paths", help="请求路径，可重复；默认合同列表")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.username, args.password)
+    result = run(args.base_url, token, args.paths or ["/api/contracts"], args.concurrency, args.duration)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        print(
+            f"并发 {args.concurrency}  请求 {result['requests']}  失败 {result['errors']}  "
+            f"{result['rps']:.1f} req/s  p50 {result['p50_ms']:.1f} ms  "
+            f"p95 {result['p95_ms']:.1f} ms  p99 {result['p99_ms']:.1f} ms"
+        )
+    if result["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
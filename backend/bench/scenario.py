@@ -0,0 +1,273 @@
+"""
+按角色混合的场景压测：普通用户浏览 / 新建 / 编辑合同，财务审批，管理员翻阅全局操作日志。
+按路由模板统计吞吐与 p50/p95/p99（并发审批冲突的 409 单独计数），可保存为基线并与基线比较（回退时退出码为 1）。
+
+先用 bench/datagen.py 生成数据（账号 bench_normal_N / bench_finance_N / bench_super_admin_N），再：
+    python bench/scenario.py --duration 60 --concurrency 64 --save-baseline bench/baseline.json
+    python bench/scenario.py --duration 60 --concurrency 64 --baseline bench/baseline.json
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from load import Client, login, percentile
+
+# 各角色默认占比（按虚拟用户数）
+DEFAULT_MIX = "normal=70,finance=20,admin=10"
+_ROLE_USERS = {"normal": "normal", "finance": "finance", "admin": "super_admin"}
+# 并发审批同一合同时后到者得到 409（状态已被他人改变）：单独计数，不计入延迟样本，也不算失败
+_CONFLICT = 409
+
+
+class Recorder:
+    """按路由模板汇总延迟、失败与冲突数；各线程先写本地，结束时合并。"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.conflicts: dict[str, int] = defaultdict(int)
+
+    def merge(self, other: "Recorder") -> None:
+        for route, samples in other.latencies.items():
+            self.latencies[route].extend(samples)
+        for route, n in other.errors.items():
+            self.errors[route] += n
+        for route, n in other.conflicts.items():
+            self.conflicts[route] += n
+
+
+class VirtualUser:
+    def __init__(self, base_url: str, token: str, recorder: Recorder, rng: random.Random):
+        self.client = Client(base_url, token)
+        self.recorder = recorder
+        self.rng = rng
+
+    def call(self, route: str, method: str, path: str, body: dict | None = None):
+        """route 为统计用的路由模板，如 GET /api/contracts/{id}；成功时返回解析后的 JSON。"""
+        started = time.perf_counter()
+        try:
+            status, data = self.client.request(method, path, body)
+        except (OSError, http.client.HTTPException):
+            status, data = 0, b""
+        elapsed = time.perf_counter() - started
+        if status == _CONFLICT:
+            self.recorder.conflicts[route] += 1
+            return None
+        if 200 <= status < 400:
+            self.recorder.latencies[route].append(elapsed)
+        else:
+            self.recorder.errors[route] += 1
+            return None
+        if status >= 300 or not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    # ---------- 角色脚本：每次调用完成一轮操作 ----------
+
+    def normal(self) -> None:
+        page = self.call("GET /api/contracts", "GET", "/api/contracts?limit=20&include_total=true")
+        items = (page or {}).get("items") or []
+        if page and page.get("next_cursor"):
+            self.call("GET /api/contracts?cursor", "GET", f"/api/contracts?limit=20&cursor={page['next_cursor']}")
+        self.call("GET /api/contracts?status_filter", "GET", "/api/contracts?limit=20&status_filter=draft")
+        if items:
+            contract_id = self.rng.choice(items)["id"]
+            self.call("GET /api/contracts/{id}", "GET", f"/api/contracts/{contract_id}")
+            self.call("GET /api/contracts/{id}/operations", "GET", f"/api/contracts/{contract_id}/operations")
+        if self.rng.random() < 0.2:
+            created = self.call("POST /api/contracts", "POST", "/api/contracts", {
+                "title": "压测合同",
+                "contract_no": f"BENCH-RUN-{uuid.uuid4().hex[:12]}",
+                "party_a": "压测甲方",
+                "party_b": "压测乙方",
+                "amount": f"{self.rng.uniform(1000, 100000):.2f}",
+            })
+            if created:
+                self.call("PUT /api/contracts/{id}", "PUT", f"/api/contracts/{created['id']}", {"note": "压测编辑"})
+                self.call("POST /api/contracts/{id}/submit", "POST", f"/api/contracts/{created['id']}/submit")
+
+    def finance(self) -> None:
+        page = self.call(
+            "GET /api/contracts?status_filter", "GET",
+            "/api/contracts?limit=20&status_filter=pending_finance&include_total=false",
+        )
+        items = (page or {}).get("items") or []
+        if items:
+            contract_id = self.rng.choice(items)["id"]
+            self.call("GET /api/contracts/{id}", "GET", f"/api/contracts/{contract_id}")
+            self.call(
+                "POST /api/contracts/{id}/approve-finance", "POST",
+                f"/api/contracts/{contract_id}/approve-finance", {"remark": None},
+            )
+        self.call("GET /api/stats/contracts", "GET", "/api/stats/contracts?dimension=status")
+
+    def admin(self) -> None:
+        # 翻阅全局操作日志：首页后沿游标向后翻几页
+        page = self.call("GET /api/operations", "GET", "/api/operations?limit=50&include_total=false")
+        for _ in range(3):
+            if not page or not page.get("next_cursor"):
+                break
+            page = self.call(
+                "GET /api/operations?cursor", "GET",
+                f"/api/operations?limit=50&include_total=false&cursor={page['next_cursor']}",
+            )
+        page = self.call(
+            "GET /api/contracts?status_filter", "GET",
+            "/api/contracts?limit=20&status_filter=finance_approved&include_total=false",
+        )
+        items = (page or {}).get("items") or []
+        if items:
+            contract_id = self.rng.choice(items)["id"]
+            self.call(
+                "POST /api/contracts/{id}/approve-admin", "POST",
+                f"/api/contracts/{contract_id}/approve-admin", {"remark": None},
+            )
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    weights = {}
+    for part in mix.split(","):
+        role, _, weight = part.partition("=")
+        role = role.strip()
+        if role not in _ROLE_USERS:
+            raise SystemExit(f"未知角色: {role}（可选 {', '.join(_ROLE_USERS)}）")
+        weights[role] = int(weight)
+    return weights
+
+
+def run(args) -> tuple[dict, float]:
+    weights = parse_mix(args.mix)
+    roles = list(weights)
+    rng = random.Random(args.seed)
+    assigned = rng.choices(roles, [weights[r] for r in roles], k=args.concurrency)
+    # 每个角色预先登录少量账号（bcrypt 登录本身不在统计范围内），虚拟用户轮流使用
+    tokens = {
+        role: [
+            login(args.base_url, f"bench_{_ROLE_USERS[role]}_{i}", args.password)
+            for i in range(1, args.accounts + 1)
+        ]
+        for role in set(assigned)
+    }
+    total = Recorder()
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def worker(n: int, role: str):
+        recorder = Recorder()
+        user = VirtualUser(args.base_url, tokens[role][n % args.accounts], recorder, random.Random(args.seed + n))
+        step = getattr(user, role)
+        while time.monotonic() < deadline:
+            step()
+        with lock:
+            total.merge(recorder)
+
+    threads = [threading.Thread(target=worker, args=(n, role)) for n, role in enumerate(assigned)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - started
+    return summarize(total, elapsed), elapsed
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    routes = {}
+    for route in sorted(set(recorder.latencies) | set(recorder.errors) | set(recorder.conflicts)):
+        samples = recorder.latencies.get(route, [])
+        routes[route] = {
+            "requests": len(samples),
+            "errors": recorder.errors.get(route, 0),
+            "conflicts": recorder.conflicts.get(route, 0),
+            "rps": len(samples) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+        }
+    return routes
+
+
+def compare(routes: dict, baseline: dict, tolerance: float) -> list[str]:
+    """p95 / p99 超过基线 (1 + tolerance) 倍或吞吐低于 (1 - tolerance) 倍视为回退。"""
+    regressions = []
+    for route, base in baseline.items():
+        cur = routes.get(route)
+        if not cur or not cur["requests"]:
+            continue
+        for key in ("p95_ms", "p99_ms"):
+            if base[key] and cur[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{route} {key} {base[key]:.1f} -> {cur[key]:.1f}")
+        if base["rps"] and cur["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{route} rps {base['rps']:.1f} -> {cur['rps']:.1f}")
+    return regressions
+
+
+def print_table(routes: dict, baseline: dict | None) -> None:
+    width = max((len(r) for r in routes), default=10)
+    print(
+        f"{'route':<{width}}  {'requests':>8}  {'errors':>6}  {'409':>6}  {'req/s':>8}  {'p50':>8}  {'p95':>8}  {'p99':>8}"
+    )
+    for route, r in routes.items():
+        line = (
+            f"{route:<{width}}  {r['requests']:>8}  {r['errors']:>6}  {r.get('conflicts', 0):>6}  {r['rps']:>8.1f}  "
+            f"{r['p50_ms']:>8.1f}  {r['p95_ms']:>8.1f}  {r['p99_ms']:>8.1f}"
+        )
+        base = (baseline or {}).get(route)
+        if base and base["p95_ms"]:
+            line += f"  (p95 {(r['p95_ms'] / base['p95_ms'] - 1) * 100:+.0f}%)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--password", default="bench123", help="datagen 生成账号的密码")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"角色占比，默认 {DEFAULT_MIX}")
+    parser.add_argument("--accounts", type=int, default=5, help="每个角色登录的账号数")
+    parser.add_argument("--concurrency", type=int, default=32, help="虚拟用户数")
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", help="与该基线文件比较")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的相对回退幅度")
+    parser.add_argument("--save-baseline", help="将本次结果保存为基线")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    routes, elapsed = run(args)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["routes"]
+    if args.json:
+        print(json.dumps({"duration": elapsed, "routes": routes}, ensure_ascii=False, indent=2))
+    else:
+        print_table(routes, baseline)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {"concurrency": args.concurrency, "mix": args.mix, "duration": elapsed, "routes": routes},
+                f, ensure_ascii=False, indent=2,
+            )
+    failed = False
+    if baseline is not None:
+        regressions = compare(routes, baseline, args.tolerance)
+        for r in regressions:
+            print(f"回退: {r}")
+        failed = bool(regressions)
+    if sum(r["errors"] for r in routes.values()):
+        print("存在失败请求")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""合同写接口查询预算检查：新建、编辑、提交与审批各自（含响应序列化）执行的 SQL 条数不得超过预算，
+超出时打印语句并以退出码 1 结束，可作为 CI 步骤。数据以 querycheck_ 用户名标识，检查结束即删除。
+
+用法：
+    python scripts/check_query_counts.py
+"""
+import os
+import sys
+import uuid
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.contracts import _contract_to_response
+from app.database import SessionLocal, engine
+from app.models.contract import Contract
+from app.models.user import User, UserRole
+from app.query_recorder import assert_max_queries, instrument_engine
+from app.schemas.contract import ContractCreate, ContractUpdate
+from app.services.contract import ContractService
+
+USER_PREFIX = "querycheck_"
+# 每个操作的查询预算：含提交后重新读取当前用户与合同详情（合同 + 附件两条）。
+# 合同关联（创建人、附件）若退化为逐条懒加载，条数会超出
+BUDGETS = {
+    "create": 6,
+    "update": 8,
+    "submit": 3,
+    "approve_finance": 5,
+    "approve_admin": 5,
+}
+
+
+def _user(db, role: UserRole) -> User:
+    user = User(id=uuid.uuid4(), username=f"{USER_PREFIX}{role.value}_{uuid.uuid4().hex[:8]}", password_hash="!", role=role)
+    db.add(user)
+    return user
+
+
+def check() -> int:
+    instrument_engine(engine)
+    db = SessionLocal()
+    users = {role: _user(db, role) for role in (UserRole.normal, UserRole.finance, UserRole.super_admin)}
+    db.commit()
+    normal, finance, admin = users[UserRole.normal], users[UserRole.finance], users[UserRole.super_admin]
+    contract_id = None
+    failures = 0
+
+    def run(name: str, fn):
+        nonlocal failures
+        try:
+            with assert_max_queries(BUDGETS[name]) as recorder:
+                result = _contract_to_response(fn())
+        except AssertionError as e:
+            failures += 1
+            print(f"FAIL {name}: {e}")
+            return None
+        print(f"ok   {name}: {recorder.count} 条查询（预算 {BUDGETS[name]}）")
+        return result
+
+    try:
+        created = run("create", lambda: ContractService.create_contract(
+            db,
+            ContractCreate(
+                title="查询预算检查", contract_no=f"QUERYCHECK-{uuid.uuid4().hex[:12]}",
+                party_a="甲方", party_b="乙方", amount=1000,
+            ),
+            normal,
+        ))
+        if created is None:
+            # 预算超出时合同仍已创建，按创建人找回以便继续检查与清理
+            contract_id = db.query(Contract.id).filter(Contract.created_by == normal.id).scalar()
+        else:
+            contract_id = created.id
+        run("update", lambda: ContractService.update_contract(db, contract_id, ContractUpdate(note="查询预算检查"), normal))
+        run("submit", lambda: ContractService.submit_contract(db, contract_id, normal))
+        run("approve_finance", lambda: ContractService.finance_approve(db, contract_id, finance))
+        run("approve_admin", lambda: ContractService.admin_approve(db, contract_id, admin))
+    finally:
+        db.rollback()
+        # 按创建人删除（含此前中断的检查遗留的数据）：中途出错时合同 id 可能尚未取得；操作日志随合同级联删除
+        check_users = db.query(User.id).filter(User.username.like(USER_PREFIX + "%"))
+        db.query(Contract).filter(Contract.created_by.in_(check_users.scalar_subquery())).delete(synchronize_session=False)
+        db.query(User).filter(User.username.like(USER_PREFIX + "%")).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+    print(f"共检查 {len(BUDGETS)} 个操作，失败 {failures} 个")
+    return 1 if failures else 0
+
+
+def main():
+    sys.exit(check())
+
+
+if __name__ == "__main__":
+    main()
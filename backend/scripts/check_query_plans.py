@@ -0,0 +1,248 @@
+"""合同列表执行计划回归检查：对 list_contracts 的各筛选组合执行 EXPLAIN，
+要求 contracts 表走索引（无 Seq Scan）且无 Sort 节点，有任一不满足时退出码为 1，可作为 CI 步骤。
+估算输入不超过 SMALL_SORT_ROWS 行的 Sort 允许（如普通用户只取自己名下的合同再排序）。
+关键词搜索（按相关度或更新时间排序）允许一种 Sort：排序输入来自全文 GIN 索引的位图扫描。
+单字关键词退回 ilike 子串匹配，按设计不走索引，不在检查范围内。
+
+用法：
+    python scripts/check_query_plans.py --seed 1000000   # 先灌入合成数据（contract_no 以 PLANCHECK- 开头）
+    python scripts/check_query_plans.py                  # 只检查现有数据
+    python scripts/check_query_plans.py --cleanup        # 删除合成数据
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import uuid
+from datetime import date
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+
+from app.database import SessionLocal, engine
+from app.models.contract import ContractStatus
+from app.models.user import User, UserRole
+from app.services.contract import ContractService
+
+PREFIX = "PLANCHECK-"
+USER_PREFIX = "plancheck_"
+PAGE_SIZE = 20
+# 不允许出现的计划节点
+_BAD_NODES = ("Sort", "Incremental Sort")
+_SEARCH_INDEX = "ix_contracts_search_vector"
+# 估算输入行数不超过此值的排序代价可忽略，规划器选它是合理的；对全表排序的回退仍会被拦下
+SMALL_SORT_ROWS = 5000
+# 关键词用例：两个以上字符，走 search_vector 短语匹配
+KEYWORD = "乙方 12"
+
+_SEED_USERS = """
+INSERT INTO users (id, username, password_hash, role, created_at)
+SELECT gen_random_uuid(), :prefix || g, '!', 'normal', now() FROM generate_series(1, :users) g
+ON CONFLICT (username) DO NOTHING
+"""
+
+# 状态分布近似生产：已生效占多数，审批队列与终止等状态较少
+_SEED_CONTRACTS = """
+WITH u AS (SELECT array_agg(id) AS ids FROM users WHERE username LIKE :user_like)
+INSERT INTO contracts (id, title, contract_no, party_a, party_b, amount, sign_date, status,
+                       created_by, created_at, updated_at)
+SELECT gen_random_uuid(), '合成合同 ' || s.g, :prefix || s.g, '甲方 ' || (s.g % 500), '乙方 ' || (s.g % 700),
+       round((s.r_amount * 1000000)::numeric, 2),
+       date '2020-01-01' + (s.r_date * 2000)::int,
+       (CASE WHEN s.r_status < 0.70 THEN 'active' WHEN s.r_status < 0.80 THEN 'draft'
+             WHEN s.r_status < 0.85 THEN 'pending_finance' WHEN s.r_status < 0.88 THEN 'finance_approved'
+             WHEN s.r_status < 0.92 THEN 'rejected' WHEN s.r_status < 0.98 THEN 'expired'
+             ELSE 'terminated' END)::contractstatus,
+       u.ids[1 + floor(s.r_user * array_length(u.ids, 1))::int],
+       s.ts, s.ts
+  FROM (SELECT g, random() AS r_amount, random() AS r_date, random() AS r_status, random() AS r_user,
+               now()::timestamp - random() * interval '1500 days' AS ts
+          FROM generate_series(1, :n) g) s, u
+"""
+
+
+def seed(n: int, users: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(_SEED_USERS), {"prefix": USER_PREFIX, "users": users})
+        conn.execute(text(_SEED_CONTRACTS), {"prefix": PREFIX, "user_like": USER_PREFIX + "%", "n": n})
+    print(f"已写入 {n} 份合成合同")
+
+
+def cleanup() -> None:
+    with engine.begin() as conn:
+        deleted = conn.execute(text("DELETE FROM contracts WHERE contract_no LIKE :p"), {"p": PREFIX + "%"}).rowcount
+        conn.execute(
+            text("DELETE FROM users u WHERE username LIKE :p AND NOT EXISTS (SELECT 1 FROM contracts c WHERE c.created_by = u.id)"),
+            {"p": USER_PREFIX + "%"},
+        )
+    print(f"已删除 {deleted} 份合成合同")
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def _sorts_search_matches(node: dict) -> bool:
+    return any(n.get("Index Name") == _SEARCH_INDEX and n["Node Type"] == "Bitmap Index Scan" for n in _walk(node))
+
+
+def plan_problems(plan: dict, keyword: bool = False) -> list[str]:
+    """
+    keyword=True 时允许对全文索引命中结果排序：相关度无法由索引给出顺序；而通用计划不知道关键词的选择度，
+    按更新时间排序时规划器也可能先取命中行再排序（Top-N 堆排序，代价随命中行数而非表大小增长）。
+    """
+    problems = []
+    for node in _walk(plan):
+        kind = node["Node Type"]
+        if kind in _BAD_NODES:
+            if node["Plan Rows"] <= SMALL_SORT_ROWS or (keyword and _sorts_search_matches(node)):
+                continue
+            problems.append(kind)
+        elif kind == "Seq Scan" and node.get("Relation Name") == "contracts":
+            problems.append("Seq Scan on contracts")
+    return problems
+
+
+def _node_label(node: dict) -> str:
+    if "Index Name" in node:
+        return f"{node['Node Type']}({node['Index Name']})"
+    if node["Node Type"] in _BAD_NODES:
+        return f"{node['Node Type']}(~{node['Plan Rows']} 行)"
+    return node["Node Type"]
+
+
+def _summary(plan: dict) -> str:
+    return ", ".join(_node_label(n) for n in _walk(plan))
+
+
+_PARAM_RE = re.compile(r"%\((\w+)\)s")
+
+
+def _to_prepared(statement: str, parameters: dict) -> tuple[str, list]:
+    """psycopg2 的 %(name)s 占位符改为 $n，返回预备语句文本与按序排列的参数值。"""
+    names: list[str] = []
+
+    def repl(m):
+        if m.group(1) not in names:
+            names.append(m.group(1))
+        return f"${names.index(m.group(1)) + 1}"
+
+    sql = _PARAM_RE.sub(repl, statement).replace("%%", "%")
+    return sql, [parameters[n] for n in names]
+
+
+class _Capture:
+    """
+    记录会话执行的最后一条 SELECT，随后在同一连接上 EXPLAIN。
+    接口经 asyncpg 以预备语句执行，复用后走通用计划（参数值未知），因此这里同样 PREPARE 后
+    强制通用计划再 EXPLAIN EXECUTE；直接 EXPLAIN 内插参数的语句会得到按具体值优化的计划，掩盖回归。
+    """
+
+    def __init__(self):
+        self.statement = None
+        self.parameters = None
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            self.statement, self.parameters = statement, parameters
+
+    def explain(self, db) -> dict:
+        sql, values = _to_prepared(self.statement, self.parameters or {})
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.execute("SET LOCAL plan_cache_mode = force_generic_plan")
+            # 不带参数执行时 psycopg2 原样发送语句，无需再转义 %
+            cursor.execute("PREPARE plancheck AS " + sql)
+            args = f"({', '.join(['%s'] * len(values))})" if values else ""
+            cursor.execute(f"EXPLAIN (FORMAT JSON) EXECUTE plancheck{args}", values)
+            plan = cursor.fetchone()[0]
+            # 预备语句属于会话而非事务，回滚不会释放
+            cursor.execute("DEALLOCATE plancheck")
+        finally:
+            cursor.close()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]["Plan"]
+
+
+def _cases(db):
+    owner = db.execute(
+        text("SELECT created_by FROM contracts GROUP BY created_by ORDER BY count(*) DESC LIMIT 1")
+    ).scalar()
+    actors = [("super_admin", User(id=uuid.uuid4(), username="plancheck", role=UserRole.super_admin))]
+    if owner is not None:
+        actors.append(("normal", User(id=owner, username="plancheck", role=UserRole.normal)))
+    statuses = [None, ContractStatus.active, ContractStatus.pending_finance, ContractStatus.terminated]
+    # 一个季度的签订日期范围
+    ranges = [(None, None), (date(2022, 1, 1), date(2022, 3, 31))]
+    # (关键词, 排序)：无关键词按更新时间；有关键词时两种排序都检查
+    searches = [(None, None), (KEYWORD, "relevance"), (KEYWORD, "updated")]
+    for role, user in actors:
+        for status_filter in statuses:
+            for sign_from, sign_to in ranges:
+                for keyword, order in searches:
+                    yield role, user, status_filter, sign_from, sign_to, keyword, order
+
+
+def check() -> int:
+    capture = _Capture()
+    failures = 0
+    checked = 0
+    event.listen(engine, "before_cursor_execute", capture)
+    db = SessionLocal()
+    try:
+        db.execute(text("ANALYZE contracts"))
+        db.execute(text("ANALYZE users"))
+        db.commit()
+        for role, user, status_filter, sign_from, sign_to, keyword, order in _cases(db):
+            cursor = None
+            for page in ("first", "cursor"):
+                if page == "cursor" and cursor is None:
+                    continue
+                _, _, items = ContractService.list_contracts(
+                    db, user, limit=PAGE_SIZE, keyword=keyword, status_filter=status_filter,
+                    sign_date_from=sign_from, sign_date_to=sign_to, cursor=cursor, order=order, include_total=False,
+                )
+                plan = capture.explain(db)
+                problems = plan_problems(plan, keyword=keyword is not None)
+                label = (
+                    f"role={role} status={status_filter.value if status_filter else '-'} "
+                    f"sign_date={'range' if sign_from else '-'} "
+                    f"keyword={f'{keyword}({order})' if keyword else '-'} page={page}"
+                )
+                checked += 1
+                if problems:
+                    failures += 1
+                    print(f"FAIL {label}: {', '.join(problems)}\n     {_summary(plan)}")
+                else:
+                    print(f"ok   {label}: {_summary(plan)}")
+                # 按相关度排序没有游标分页
+                cursor = ContractService.next_cursor(items, PAGE_SIZE, order or "updated")
+                db.rollback()
+    finally:
+        db.close()
+        event.remove(engine, "before_cursor_execute", capture)
+    print(f"共检查 {checked} 个组合，失败 {failures} 个")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合同列表执行计划回归检查")
+    parser.add_argument("--seed", type=int, default=0, metavar="N", help="检查前写入 N 份合成合同")
+    parser.add_argument("--users", type=int, default=200, help="合成合同分配给的用户数")
+    parser.add_argument("--cleanup", action="store_true", help="删除合成数据后退出")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+        return
+    if args.seed:
+        seed(args.seed, args.users)
+    sys.exit(check())
+
+
+if __name__ == "__main__":
+    main()
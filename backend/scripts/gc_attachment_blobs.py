@@ -0,0 +1,22 @@
+"""清理无引用的附件内容块（可配合 cron 定期执行）。"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.blob import collect_garbage
+from app.storage import LocalStorage
+
+
+def main():
+    db = SessionLocal()
+    try:
+        removed = collect_garbage(db, LocalStorage(), settings.blob_gc_grace_seconds)
+        print(f"已删除 {removed} 个无引用内容块")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""从 CSV / XLSX 批量导入合同（子公司上线等大批量场景）。
+
+用法：python scripts/import_contracts.py contracts.xlsx --username admin [--skip-invalid] [--dry-run]
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models.user import User
+from app.services.importer import import_contracts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量导入合同")
+    parser.add_argument("file", help="CSV 或 XLSX 文件")
+    parser.add_argument("--username", default="admin", help="记为创建人的用户名")
+    parser.add_argument("--skip-invalid", action="store_true", help="跳过校验失败的行，导入其余行")
+    parser.add_argument("--dry-run", action="store_true", help="只校验，不写入")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == args.username).first()
+        if not user:
+            print(f"用户不存在: {args.username}")
+            sys.exit(1)
+        started = time.monotonic()
+        with open(args.file, "rb") as f:
+            result = import_contracts(
+                db, f, args.file, user, skip_invalid=args.skip_invalid, dry_run=args.dry_run
+            )
+        elapsed = time.monotonic() - started
+    finally:
+        db.close()
+
+    for err in result.errors:
+        print(f"第 {err['row']} 行: {err['message']}")
+    if result.failed > len(result.errors):
+        print(f"……其余 {result.failed - len(result.errors)} 行错误未列出")
+    rate = result.imported / elapsed if elapsed else 0
+    state = "已提交" if result.committed else "未写入"
+    print(f"共 {result.total} 行，有效 {result.imported} 行，失败 {result.failed} 行，{state}（{elapsed:.1f}s，{rate:.0f} 行/s）")
+    if result.failed and not result.committed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""操作日志分区维护：预建未来月份分区，归档并删除超过保留期的分区。建议每天由 cron 执行一次。
+
+用法：python scripts/maintain_operation_logs.py [--ahead 3] [--retention-months 24] [--archive-dir DIR] [--no-archive]
+"""
+import argparse
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.database import engine
+from app.services.oplog_partitions import archive_partitions, ensure_partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="操作日志分区维护")
+    parser.add_argument("--ahead", type=int, default=settings.oplog_partitions_ahead, help="预建的未来月份数")
+    parser.add_argument("--retention-months", type=int, default=settings.oplog_retention_months, help="保留月数")
+    parser.add_argument("--archive-dir", default=settings.oplog_archive_dir, help="归档文件目录")
+    parser.add_argument("--no-archive", action="store_true", help="只预建分区，不归档")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        created = ensure_partitions(conn, args.ahead)
+        print(f"新建分区 {len(created)} 个" + (f": {', '.join(created)}" if created else ""))
+        if args.no_archive:
+            return
+        archived = archive_partitions(conn, args.retention_months, args.archive_dir)
+        for path in archived:
+            print(f"已归档: {path}")
+        print(f"归档分区 {len(archived)} 个")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""将历史附件文件迁入内容寻址存储（升级到迁移 006 后执行一次，可重复执行）。"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.models.attachment import ContractAttachment
+from app.services.blob import acquire_blob
+from app.storage import LocalStorage
+
+
+def main():
+    storage = LocalStorage()
+    db = SessionLocal()
+    migrated = missing = 0
+    last_id = None
+    try:
+        while True:
+            q = db.query(ContractAttachment).filter(ContractAttachment.blob_sha256.is_(None))
+            if last_id is not None:
+                q = q.filter(ContractAttachment.id > last_id)
+            atts = q.order_by(ContractAttachment.id).limit(100).all()
+            if not atts:
+                break
+            for att in atts:
+                last_id = att.id
+                legacy_key = att.file_path
+                try:
+                    with storage.open(legacy_key) as f:
+                        staged = storage.stage(f)
+                except FileNotFoundError:
+                    print(f"文件缺失，跳过: {att.id} {legacy_key}")
+                    missing += 1
+                    continue
+                att.file_path = acquire_blob(db, storage, staged)
+                att.sha256 = staged.sha256
+                att.blob_sha256 = staged.sha256
+                att.file_size = staged.size
+                db.commit()
+                # 提交成功后再删除旧文件
+                storage.delete(legacy_key)
+                migrated += 1
+        print(f"完成：迁移 {migrated} 个附件，缺失 {missing} 个")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
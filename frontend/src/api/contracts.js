@@ -48,8 +48,8 @@ export function rejectAdmin(id, remark) {
   return client.post(`/contracts/${id}/reject-admin`, { remark: remark || null });
 }
 
-export function getContractOperations(contractId) {
-  return client.get(`/contracts/${contractId}/operations`);
+export function getContractOperations(contractId, params) {
+  return client.get(`/contracts/${contractId}/operations`, { params });
 }
 
 export function exportContractPdf(contractId) {
@@ -67,3 +67,28 @@ export function uploadAttachment(contractId, file) {
 export function getAttachmentDownloadUrl(contractId, attachmentId) {
   return `/api/contracts/${contractId}/attachments/${attachmentId}`;
 }
+
+export function exportContractsPdfZip(body) {
+  return client.post("/contracts/export/pdf", body, { responseType: "blob" });
+}
+
+export function bulkContractAction(ids, action, remark) {
+  return client.post("/contracts/bulk", { ids, action, remark: remark || null });
+}
+
+export function importContracts(file, { skipInvalid = false, dryRun = false } = {}) {
+  const form = new FormData();
+  form.append("file", file);
+  return client.post("/contracts/import", form, {
+    params: { skip_invalid: skipInvalid, dry_run: dryRun },
+    headers: { "Content-Type": "multipart/form-data" },
+  });
+}
+
+export function exportContractList(params, format = "csv") {
+  return client.get("/contracts/export", { params: { ...params, format }, responseType: "blob" });
+}
+
+export function getContractStats(dimension = "status", limit = 50) {
+  return client.get("/stats/contracts", { params: { dimension, limit } });
+}
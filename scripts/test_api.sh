@@ -79,5 +79,18 @@ curl -s -X POST "$BASE/auth/change-password" -H "Authorization: Bearer $TOKEN_NO
 R=$(curl -s -X POST "$BASE/auth/login" -H "Content-Type: application/json" -d '{"username":"normal1","password":"n456"}')
 [ -n "$(echo "$R" | python3 -c "import sys,json; print(json.load(sys.stdin).get('access_token',''))")" ] && ok "login with new password" || fail "login new password"
 
+echo "=== 13. 合同列表执行计划（通用计划下走索引、无排序） ==="
+# 在后端容器内连数据库执行；本地运行后端时可设 BACKEND_EXEC= 直接在 backend 目录执行
+BACKEND_EXEC=${BACKEND_EXEC-"docker compose exec -T backend"}
+PLAN_ROWS=${PLAN_ROWS:-200000}
+cd "$(dirname "$0")/../backend"
+PLAN_OK=1
+$BACKEND_EXEC python scripts/check_query_plans.py --seed "$PLAN_ROWS" || PLAN_OK=0
+$BACKEND_EXEC python scripts/check_query_plans.py --cleanup > /dev/null
+[ "$PLAN_OK" = "1" ] && ok "query plans" || fail "query plans regressed"
+
+echo "=== 14. 合同新建/编辑/审批的查询预算 ==="
+$BACKEND_EXEC python scripts/check_query_counts.py && ok "query budgets" || fail "query budget exceeded"
+
 echo ""
-echo -e "${GREEN}=== 全部 12 项检查通过 ===${NC}"
+echo -e "${GREEN}=== 全部 14 项检查通过 ===${NC}"